@@ -0,0 +1,51 @@
+#
+# bench_cli
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def run(args, number, cwd=None):
+    ts = []
+    for _ in range(number):
+        t = time.perf_counter()
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=cwd, check=False)
+        ts.append(time.perf_counter() - t)
+    return statistics.median(ts) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-C', dest='cwd',
+                        help='working directory')
+    parser.add_argument('--number', type=int, default=11)
+    parser.add_argument('--target', type=float, default=150.0,
+                        help='startup target in milliseconds, excluding the interpreter startup')
+    args = parser.parse_args()
+
+    os.environ['PYTHONPATH'] = os.pathsep.join((os.path.dirname(os.path.dirname(os.path.abspath(__file__))), *sys.path))
+
+    base = run((sys.executable, '-c', 'pass'), args.number, args.cwd)
+    print(f'{"python -c pass":<40} {base:10.3f} ms')
+    ok = True
+    for cmd in (('--help',), ('next',), ('stat',)):
+        t = run((sys.executable, '-m', 'scmver', *cmd), args.number, args.cwd) - base
+        print(f'{"scmver " + " ".join(cmd):<40} {t:10.3f} ms')
+        if (cmd[0] != '--help'
+            and t > args.target):
+            ok = False
+    if not ok:
+        sys.exit(f'startup target of {args.target:g} ms is exceeded')
+
+
+if __name__ == '__main__':
+    main()
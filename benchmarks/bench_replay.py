@@ -0,0 +1,70 @@
+#
+# bench_replay
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+import argparse
+import cProfile
+import os
+import pstats
+import time
+
+from scmver import cache, core, util
+
+
+def parser_of(name):
+    return core._backend(dict(core._IMPLS)[name])
+
+
+def record(root, cassette):
+    fp = cache.fingerprint(os.path.abspath(root))
+    if fp is None:
+        raise SystemExit(f'not a working directory: {root}')
+    root, name = fp[:2]
+    with util.trace() as events:
+        with util.record(cassette, root=root, name=name):
+            info = parser_of(name)(root, name=name)
+    print(f'{name}: {info}')
+    print(f'{sum(ev.name == "exec" for ev in events)} commands recorded')
+
+
+def replay(cassette, number, profile):
+    with util.replay(cassette) as meta:
+        root, name = meta['root'], meta['name']
+        parse = parser_of(name)
+        print(f'{name}: {parse(root, name=name)}')
+        if profile:
+            prof = cProfile.Profile()
+            for _ in range(number):
+                prof.runcall(parse, root, name=name)
+            pstats.Stats(prof).sort_stats('cumulative').print_stats(20)
+            return
+
+        ts = []
+        for _ in range(number):
+            t = time.perf_counter()
+            parse(root, name=name)
+            ts.append(time.perf_counter() - t)
+        print(f'{min(ts) * 1000:.3f} ms (min of {number})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='measure the parsing of SCM outputs without running SCM commands')
+    parser.add_argument('cassette')
+    parser.add_argument('--record', metavar='ROOT',
+                        help='record SCM commands in the working directory')
+    parser.add_argument('--number', type=int, default=1000)
+    parser.add_argument('--profile', action='store_true')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.cassette)
+    else:
+        replay(args.cassette, args.number, args.profile)
+
+
+if __name__ == '__main__':
+    main()
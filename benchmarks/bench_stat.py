@@ -0,0 +1,291 @@
+#
+# bench_stat
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from scmver import __version__, core, util
+
+
+BACKENDS = ('git', 'hg', 'fossil', 'darcs', 'bzr', 'svn')
+
+EPOCH = 1_700_000_000
+
+
+def fast_export(commits, tags, merge_every, files):
+    # a git fast-import stream which is also used by the other backends
+    out = []
+    mark = 0
+    step = max(commits // tags, 1) if tags else 0
+    n = 0
+    for i in range(commits):
+        parent = mark
+        if (merge_every
+            and i
+            and i % merge_every == 0):
+            mark += 1
+            out.append(_commit('refs/heads/topic', mark, parent, f'topic {i}', f'topic{i % files}', str(i)))
+            topic = mark
+        else:
+            topic = 0
+        mark += 1
+        out.append(_commit('refs/heads/master', mark, parent, f'commit {i}', f'file{i % files}', str(i), topic))
+        if (step
+            and n < tags
+            and (i + 1) % step == 0):
+            out.append(f'reset refs/tags/v{n // 100}.{n % 100}\nfrom :{mark}\n\n')
+            n += 1
+    out.append('done\n')
+    return ''.join(out).encode('utf-8')
+
+
+def _commit(ref, mark, parent, msg, path, data, merge=0):
+    out = [f'commit {ref}\nmark :{mark}\ncommitter scmver <scmver@example.com> {EPOCH + mark} +0000\n']
+    out.append(f'data {len(msg)}\n{msg}\n')
+    if parent:
+        out.append(f'from :{parent}\n')
+    if merge:
+        out.append(f'merge :{merge}\n')
+    out.append(f'M 644 inline {path}\ndata {len(data)}\n{data}\n\n')
+    return ''.join(out)
+
+
+def svn_dump(commits, tags, files):
+    out = [b'SVN-fs-dump-format-version: 2\n\n']
+
+    def revision(n, msg):
+        props = _props({'svn:log': msg})
+        out.append(f'Revision-number: {n}\nProp-content-length: {len(props)}\nContent-length: {len(props)}\n\n'.encode())
+        out.append(props + b'\n')
+
+    def node(path, kind, action, text=None, **kwargs):
+        head = [f'Node-path: {path}', f'Node-kind: {kind}', f'Node-action: {action}']
+        head += (f'Node-copyfrom-{k}: {v}' for k, v in kwargs.items())
+        body = b''
+        if action == 'add' and 'rev' not in kwargs:
+            body = _props({})
+            head.append(f'Prop-content-length: {len(body)}')
+        if text is not None:
+            head.append(f'Text-content-length: {len(text)}')
+            body += text
+        if body:
+            head.append(f'Content-length: {len(body)}')
+        out.append(('\n'.join(head) + '\n\n').encode() + body + b'\n\n')
+
+    revision(0, '')
+    revision(1, 'layout')
+    for p in ('trunk', 'branches', 'tags'):
+        node(p, 'dir', 'add')
+    step = max(commits // tags, 1) if tags else 0
+    n = 0
+    r = 1
+    seen = set()
+    for i in range(commits):
+        r += 1
+        revision(r, f'commit {i}')
+        path = f'trunk/file{i % files}'
+        node(path, 'file', 'change' if path in seen else 'add', str(i).encode())
+        seen.add(path)
+        if (step
+            and n < tags
+            and (i + 1) % step == 0):
+            r += 1
+            revision(r, f'tag {n}')
+            node(f'tags/v{n // 100}.{n % 100}', 'dir', 'add', rev=r - 1, path='trunk')
+            n += 1
+    return b''.join(out)
+
+
+def _props(props):
+    out = []
+    for k, v in props.items():
+        k = k.encode()
+        v = v.encode()
+        out.append(b'K %d\n%s\nV %d\n%s\n' % (len(k), k, len(v), v))
+    out.append(b'PROPS-END\n')
+    return b''.join(out)
+
+
+def generate(scm, root, args):
+    def run(*cmd, input=None, cwd=root):
+        subprocess.run(cmd, input=input, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    os.makedirs(root)
+    if scm == 'svn':
+        repo = os.path.join(os.path.dirname(root), 'svn-repo')
+        run('svnadmin', 'create', repo, cwd=None)
+        run('svnadmin', 'load', '-q', repo, input=svn_dump(args.commits, args.tags, args.files), cwd=None)
+        run('svn', 'checkout', '-q', f'file://{repo}/trunk', root, cwd=None)
+        return
+
+    stream = fast_export(args.commits, args.tags, args.merge_every, args.files)
+    if scm == 'git':
+        run('git', 'init', '-q')
+        run('git', 'fast-import', '--quiet', input=stream)
+        run('git', 'checkout', '-q', '-f', 'master')
+    elif scm == 'hg':
+        # debugbuilddag is much faster than converting the stream, but it
+        # only builds a linear history
+        run('hg', 'init')
+        run('hg', 'debugbuilddag', '--new-file', f'+{args.commits}')
+        run('hg', 'update', '-q', 'tip')
+        nodes = subprocess.run(('hg', 'log', '-T', '{node}\\n', '-r', 'all()'), cwd=root,
+                               stdout=subprocess.PIPE, text=True, check=True).stdout.split()
+        if args.tags:
+            step = max(args.commits // args.tags, 1)
+            with open(os.path.join(root, '.hgtags'), 'w') as fp:
+                for n, node in enumerate(nodes[step - 1::step][:args.tags]):
+                    fp.write(f'{node} v{n // 100}.{n % 100}\n')
+            run('hg', 'add', '.hgtags')
+            run('hg', 'commit', '-q', '-u', 'scmver', '-m', 'tags')
+    elif scm == 'fossil':
+        repo = os.path.join(os.path.dirname(root), 'bench.fossil')
+        run('fossil', 'import', '--git', repo, input=stream)
+        run('fossil', 'open', '-f', repo)
+    elif scm == 'darcs':
+        run('darcs', 'convert', 'import', '--quiet', 'repo', input=stream)
+        for n in os.listdir(os.path.join(root, 'repo')):
+            os.rename(os.path.join(root, 'repo', n), os.path.join(root, n))
+        os.rmdir(os.path.join(root, 'repo'))
+    elif scm == 'bzr':
+        stream_path = os.path.join(os.path.dirname(root), 'bench.fi')
+        with open(stream_path, 'wb') as fp:
+            fp.write(stream)
+        run('brz', 'fast-import', stream_path, '.')
+        run('brz', 'checkout', '-q', 'master', '.')
+
+    for i in range(min(args.dirty, args.files)):
+        path = os.path.join(root, f'file{i}')
+        if os.path.exists(path):
+            with open(path, 'a') as fp:
+                fp.write('dirty\n')
+
+
+def measure(root, number):
+    ts = []
+    for _ in range(number):
+        with util.trace() as events:
+            t = time.perf_counter()
+            # lazy fields are resolved too
+            info = core.stat(root)
+            info = list(info) if info else None
+            ts.append(time.perf_counter() - t)
+    calls = [ev.args['stdout'] + ev.args['stderr'] for ev in events if ev.name == 'exec']
+    rv = {
+        'info': info,
+        'latency': statistics.median(ts) * 1000,
+        'latency_min': min(ts) * 1000,
+        'processes': len(calls),
+        'bytes_read': sum(calls),
+    }
+    if resource:
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        rv['peak_rss'] = rss * (1 if sys.platform == 'darwin' else 1024)
+    return rv
+
+
+def compare(old, new):
+    print(f'{"":<8} {"":<12} {"old":>12} {"new":>12} {"ratio":>8}')
+    for scm, r in new['results'].items():
+        if scm not in old['results']:
+            continue
+        for k in ('latency', 'processes', 'bytes_read', 'peak_rss'):
+            if k in r and k in old['results'][scm]:
+                a, b = old['results'][scm][k], r[k]
+                print(f'{scm:<8} {k:<12} {a:12.1f} {b:12.1f} {b / a if a else 0:8.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('backends', nargs='*', default=BACKENDS, metavar='BACKEND',
+                        help=f'backends to benchmark ({", ".join(BACKENDS)})')
+    parser.add_argument('--commits', type=int, default=1000)
+    parser.add_argument('--tags', type=int, default=10)
+    parser.add_argument('--merge-every', type=int, default=0,
+                        help='merge a topic commit every N commits (except for hg and svn)')
+    parser.add_argument('--files', type=int, default=100,
+                        help='number of files in the working copy')
+    parser.add_argument('--dirty', type=int, default=0,
+                        help='number of modified files in the working copy')
+    parser.add_argument('--number', type=int, default=5)
+    parser.add_argument('--workdir',
+                        help='directory to keep the generated repositories')
+    parser.add_argument('-o', '--output',
+                        help='file to store the results')
+    parser.add_argument('--compare',
+                        help='results of the previous run')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        # run in a child process to isolate the resource usage of SCM commands
+        print(json.dumps(measure(args.measure, args.number)))
+        return
+
+    tmp = None
+    if not args.workdir:
+        tmp = args.workdir = tempfile.mkdtemp(prefix='scmver-bench-')
+    params = {k: getattr(args, k) for k in ('commits', 'tags', 'merge_every', 'files', 'dirty')}
+    key = '-'.join(str(v) for v in params.values())
+    results = {}
+    try:
+        for scm in args.backends:
+            if not shutil.which({'bzr': 'brz'}.get(scm, scm)):
+                print(f'{scm:<8} skipped')
+                continue
+            root = os.path.join(args.workdir, f'{scm}-{key}', 'wc')
+            if not os.path.isdir(root):
+                t = time.perf_counter()
+                try:
+                    generate(scm, root, args)
+                except (OSError, subprocess.CalledProcessError) as e:
+                    print(f'{scm:<8} failed to generate: {e}')
+                    continue
+                print(f'{scm:<8} generated in {time.perf_counter() - t:.1f} s')
+
+            env = os.environ.copy()
+            env['PYTHONPATH'] = os.pathsep.join((os.path.dirname(os.path.dirname(os.path.abspath(__file__))), *sys.path))
+            proc = subprocess.run((sys.executable, __file__, '--measure', root, '--number', str(args.number)),
+                                  stdout=subprocess.PIPE, env=env, check=True)
+            r = results[scm] = json.loads(proc.stdout)
+            print(f'{scm:<8} {r["latency"]:10.3f} ms  {r["processes"]:3d} processes  {r["bytes_read"]:10d} bytes'
+                  + (f'  {r["peak_rss"] / 1024 / 1024:8.1f} MiB' if 'peak_rss' in r else ''))
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    data = {
+        'scmver': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(data, fp, indent=2)
+    if args.compare:
+        with open(args.compare) as fp:
+            compare(json.load(fp), data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#
+# bench_version
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+import argparse
+import itertools
+import operator
+import os
+import random
+import timeit
+
+try:
+    import packaging.version
+except ImportError:
+    packaging = None
+
+from scmver import core
+
+
+def corpus(n, seed=0):
+    rand = random.Random(seed)
+    versions = []
+    for _ in range(n):
+        v = '.'.join(str(rand.randrange(20)) for _ in range(rand.randint(1, 4)))
+        r = rand.random()
+        if r < 0.1:
+            v += f'{rand.choice(("a", "b", "rc"))}{rand.randrange(5)}'
+        elif r < 0.15:
+            v += f'.post{rand.randrange(5)}'
+        elif r < 0.2:
+            v += f'.dev{rand.randrange(5)}'
+        versions.append(v)
+    return versions
+
+
+def load(path, n):
+    with open(path, encoding='utf-8') as fp:
+        versions = [l for l in fp.read().splitlines() if l and not l.startswith('#')]
+    valid = []
+    for v in versions:
+        try:
+            # tags are prefixed with 'v'
+            if v[0].isdigit():
+                core.Version(v)
+                valid.append(v)
+        except core.VersionError:
+            pass
+    return list(itertools.islice(itertools.cycle(valid), n))
+
+
+def bench(name, stmt, number):
+    t = min(timeit.repeat(stmt, number=number, repeat=3))
+    print(f'{name:<40} {t / number * 1000:10.3f} ms')
+
+
+def throughput(name, stmt, n, number):
+    t = min(timeit.repeat(stmt, number=number, repeat=3))
+    print(f'{name:<40} {n * number / t:10.0f} tags/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=100_000,
+                        help='number of versions')
+    parser.add_argument('--number', type=int, default=5)
+    parser.add_argument('--corpus', nargs='?', const=os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'versions.txt'),
+                        help='file of version strings (tests/data/versions.txt by default) instead of random versions')
+    args = parser.parse_args()
+
+    versions = load(args.corpus, args.n) if args.corpus else corpus(args.n)
+    tags = [f'v{v}' for v in versions]
+    print(f'parsing {len(tags)} tags')
+    throughput('scmver.core.Version', lambda: [core.Version(v) for v in tags], len(tags), args.number)
+    throughput('scmver.core.Version.parse_many', lambda: list(core.Version.parse_many(tags)), len(tags), args.number)
+    throughput('scmver.core.next_version', lambda: [core.next_version(core.SCMInfo(v)) for v in tags], len(tags), args.number)
+    if packaging:
+        throughput('packaging.version.Version', lambda: [packaging.version.Version(v) for v in tags], len(tags), args.number)
+
+    print(f'normalizing and updating {len(versions)} versions')
+    scmver = [core.Version(v) for v in versions]
+    bench('scmver.core.Version.__str__', lambda: [str(v) for v in scmver], args.number)
+    bench('scmver.core.Version.normalize', lambda: [v.normalize() for v in scmver], args.number)
+    bench('scmver.core.Version.normalize (str)', lambda: [str(v.normalize()) for v in scmver], args.number)
+    scmver = [v for v in scmver if not v.local]
+    bench('scmver.core.Version.update (micro)', lambda: [v.update('micro', 0) for v in scmver], args.number)
+    bench('scmver.core.Version.update (minor.dev)', lambda: [v.update('minor.dev', 0) for v in scmver], args.number)
+    if packaging:
+        pv = [packaging.version.Version(v) for v in versions]
+        bench('packaging.version.Version.__str__', lambda: [str(v) for v in pv], args.number)
+
+    print(f'sorting {len(versions)} versions')
+
+    scmver = [core.Version(v) for v in versions]
+    frozen = [core.FrozenVersion(v) for v in versions]
+    bench('scmver.core.Version (parse)', lambda: [core.Version(v) for v in versions], args.number)
+    bench('scmver.core.Version (sort)', lambda: sorted(scmver), args.number)
+    bench('scmver.core.FrozenVersion (sort)', lambda: sorted(frozen), args.number)
+    bench('scmver.core.Version (sort by sort_key)', lambda: sorted(scmver, key=operator.attrgetter('sort_key')), args.number)
+    if packaging:
+        pv = [packaging.version.Version(v) for v in versions]
+        bench('packaging.version.Version (parse)', lambda: [packaging.version.Version(v) for v in versions], args.number)
+        bench('packaging.version.Version (sort)', lambda: sorted(pv), args.number)
+        assert [str(v.normalize()) for v in sorted(scmver)] == [str(v) for v in sorted(pv)]
+
+
+if __name__ == '__main__':
+    main()
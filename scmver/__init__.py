@@ -1,15 +1,37 @@
 #
 # scmver
 #
-#   Copyright (c) 2019 Akinori Hattori <hattya@gmail.com>
+#   Copyright (c) 2019-2026 Akinori Hattori <hattya@gmail.com>
 #
 #   SPDX-License-Identifier: MIT
 #
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import (generate, get_version, load_version, next_version, load_project, select_tag, stat,
+                       SCMInfo, LazySCMInfo, Version, FrozenVersion, VersionError)
+
 __author__ = 'Akinori Hattori <hattya@gmail.com>'
 try:
     from .__version__ import version as __version__
 except ImportError:
     __version__ = 'unknown'
 
-from .core import *
+__all__ = ['generate', 'get_version', 'load_version', 'next_version', 'load_project', 'select_tag', 'stat',
+           'SCMInfo', 'LazySCMInfo', 'Version', 'FrozenVersion', 'VersionError']
+
+
+# scmver.core is imported on first access, because scmver.setuptools is
+# imported for every project which is built by setuptools
+def __getattr__(name: str) -> object:
+    if name in __all__:
+        from . import core
+
+        globals()[name] = v = getattr(core, name)
+        return v
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -7,16 +7,18 @@
 #
 
 from __future__ import annotations
+import os
 import re
 from typing import cast, Any
 
-from . import core, util
+from . import cache, core, util
 from ._typing import Path
 
 
 __all__ = ['parse', 'version', 'run']
 
 _TAG = 'bazaar.tag'
+_SELECT = 'tag_select'
 
 _version_re = re.compile(r"""
     \A
@@ -55,13 +57,12 @@ def parse(root: Path, name: str | None = '.bzr', **kwargs: Any) -> core.SCMInfo
         dirty = info['clean'] == 'False'
 
         tag_re = re.compile(kwargs[_TAG]) if _TAG in kwargs else None
-        out = [l.split() for l in run('tags', cwd=root, env={'PYTHONIOENCODING': 'utf-8'}, encoding='utf-8')[0].splitlines()]
-        out.sort(key=lambda v: v[1], reverse=True)
-        for tag, rev in out:
-            if (rev == info['revno']
-                and (not tag_re
-                     or tag_re.match(tag))):
-                return core.SCMInfo(tag, _distance_of(root, rev), info['revno'], dirty, info['branch-nick'])
+        tags = [tag for tag in _tags_of(root, **kwargs).get(info['revno'], ())
+                if (not tag_re
+                    or tag_re.match(tag))]
+        if tags:
+            tag = cast(str, core.select_tag(tags, kwargs.get(_SELECT, 'scm-default')))
+            return core.SCMInfo(tag, _distance_of(root, info['revno']), info['revno'], dirty, info['branch-nick'])
         return core.SCMInfo(distance=_distance_of(root),
                             revision=info['revno'],
                             dirty=dirty,
@@ -74,6 +75,24 @@ def _version_info(root: Path) -> dict[str, str]:
     return dict(cast(tuple[str, str], (s.strip() for s in l.split(':', 1))) for l in out)
 
 
+def _tags_of(root: Path, **kwargs: Any) -> dict[str, list[str]]:
+    index = cache.TagIndex.open('bazaar', os.path.abspath(root), **kwargs)
+    st = cache.stamp(*(os.path.join(root, '.bzr', 'branch', n) for n in ('tags', 'last-revision'))) if index else None
+    if (index
+        and st
+        and (tags := index.get(st)) is not None):
+        return tags
+
+    tags = {}
+    for l in run('tags', cwd=root, env={'PYTHONIOENCODING': 'utf-8'}, encoding='utf-8')[0].splitlines():
+        tag, rev = l.split()
+        tags.setdefault(rev, []).append(tag)
+    if (index
+        and st):
+        index.update(st, tags)
+    return tags
+
+
 def _distance_of(root: Path, rev: int | str | None = None) -> int:
     if rev is None:
         rev = 1
@@ -0,0 +1,335 @@
+#
+# scmver.cache
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import cast, Any, TypeVar
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+
+from . import util
+from ._typing import Path
+
+
+__all__ = ['TagIndex', 'cache_dir', 'fingerprint', 'info_key', 'load_info', 'lock', 'memoize', 'save_info', 'stamp', 'tool_version']
+
+# files which are changed by commits, tags, and updates
+_MARKERS: dict[str, Sequence[str]] = {
+    '.bzr': ('.bzr/branch/last-revision', '.bzr/branch/tags', '.bzr/checkout/dirstate'),
+    '_darcs': ('_darcs/hashed_inventory', '_darcs/inventory'),
+    '.fslckout': ('.fslckout',),
+    '_FOSSIL_': ('_FOSSIL_',),
+    # see _git_files
+    '.git': (),
+    '.hg': ('.hg/dirstate', '.hg/branch', '.hg/bookmarks', '.hg/localtags', '.hg/store/00changelog.i', '.hgtags'),
+    '.hg_archival.txt': ('.hg_archival.txt',),
+    '.svn': ('.svn/wc.db',),
+}
+# lifetime of shared entries
+_TTL = 86400
+# time to wait for another process
+_WAIT = 10.0
+# maximum number of memoized entries
+_MAXSIZE = 128
+
+_T = TypeVar('_T')
+
+_infos: dict[str, tuple[list[Any], list[Any] | None]] = {}
+_tools: dict[str, tuple[list[int], tuple[Any, ...]]] = {}
+_memo: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+_flights: dict[str, concurrent.futures.Future[Any]] = {}
+_memo_lock = threading.Lock()
+
+
+def cache_dir(**kwargs: Any) -> str | None:
+    return kwargs.get('cache_dir') or os.environ.get('SCMVER_CACHE_DIR') or None
+
+
+def memoize(key: str, ttl: float, func: Callable[[], _T]) -> _T:
+    with _memo_lock:
+        # entries are valid while they are younger than ttl of the caller
+        if ((c := _memo.get(key)) is not None
+            and time.monotonic() - c[0] < ttl):
+            _memo.move_to_end(key)
+            return cast(_T, c[1])
+        # concurrent callers share the result of the first one
+        if (f := _flights.get(key)) is not None:
+            owner = False
+        else:
+            f = _flights[key] = concurrent.futures.Future()
+            owner = True
+    if not owner:
+        return cast(_T, f.result())
+
+    try:
+        rv = func()
+    except BaseException as e:
+        with _memo_lock:
+            del _flights[key]
+        f.set_exception(e)
+        raise
+    with _memo_lock:
+        del _flights[key]
+        _memo[key] = (time.monotonic(), rv)
+        _memo.move_to_end(key)
+        while len(_memo) > _MAXSIZE:
+            _memo.popitem(last=False)
+    f.set_result(rv)
+    return rv
+
+
+def stamp(*paths: Path) -> list[int] | None:
+    rv: list[int] = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            return None
+        rv += (st.st_mtime_ns, st.st_size)
+    return rv
+
+
+def fingerprint(root: str, **kwargs: Any) -> list[Any] | None:
+    for path in util.parents(root, kwargs.get('ceiling_dirs'), kwargs.get('one_filesystem', False)):
+        rv: list[Any] = []
+        for name, files in _MARKERS.items():
+            if not os.path.exists(p := os.path.join(path, name)):
+                continue
+            elif name == '.git':
+                if (gitfiles := _git_files(p)) is None:
+                    return None
+                files = gitfiles
+            rv.append(name)
+            for f in files:
+                rv.append(stamp(os.path.join(path, f)))
+        if rv:
+            return [path, *rv]
+    return None
+
+
+def _git_files(path: str) -> list[str] | None:
+    gitdir = common = path
+    if os.path.isfile(path):
+        # worktrees and submodules have a file which points to the git
+        # directory, and worktrees share refs with the main one
+        try:
+            with open(path, encoding='utf-8') as f:
+                l = f.readline().strip()
+            if not l.startswith('gitdir:'):
+                return None
+            gitdir = common = os.path.join(os.path.dirname(path), l[7:].strip())
+            if os.path.isfile(p := os.path.join(gitdir, 'commondir')):
+                with open(p, encoding='utf-8') as f:
+                    common = os.path.join(gitdir, f.read().strip())
+        except OSError:
+            return None
+    rv = [path, *(os.path.join(gitdir, f) for f in ('HEAD', 'index', 'logs/HEAD')), os.path.join(common, 'packed-refs')]
+    # directories are changed when refs are added or updated
+    for top in ('heads', 'tags'):
+        for dir, dirs, _ in os.walk(os.path.join(common, 'refs', top)):
+            dirs.sort()
+            rv.append(dir)
+    return rv
+
+
+def load_info(key: str, fp: Sequence[Any], **kwargs: Any) -> tuple[bool, list[Any] | None]:
+    if ((c := _infos.get(key)) is not None
+        and c[0] == list(fp)):
+        return True, c[1]
+    elif dir := _share_dir(**kwargs):
+        try:
+            with open(os.path.join(dir, f'info-{key}.json'), encoding='utf-8') as f:
+                o = json.load(f)
+            if o['fingerprint'] == list(fp):
+                _infos[key] = (o['fingerprint'], o['info'])
+                return True, o['info']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    return False, None
+
+
+def save_info(key: str, fp: Sequence[Any], info: Sequence[Any] | None, **kwargs: Any) -> None:
+    info = list(info) if info is not None else None
+    _infos[key] = (list(fp), info)
+    if not (dir := _share_dir(**kwargs)):
+        return
+
+    try:
+        # remove stale entries
+        now = time.time()
+        with os.scandir(dir) as it:
+            for e in it:
+                if (e.name.startswith('info-')
+                    and e.stat().st_mtime < now - _TTL):
+                    os.unlink(e.path)
+
+        _dump(os.path.join(dir, f'info-{key}.json'), {'fingerprint': list(fp), 'info': info})
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def lock(key: str, **kwargs: Any) -> Iterator[bool]:
+    # the first process of a build computes the entry, and the others wait
+    # for it
+    fd = None
+    if (fcntl is not None
+        and (dir := _share_dir(**kwargs))):
+        wait = _WAIT
+        if kwargs.get('deadline') is not None:
+            wait = min(wait, float(kwargs['deadline']))
+        fd = _flock(os.path.join(dir, f'info-{key}.lock'), wait)
+    try:
+        yield fd is not None
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _flock(path: str, wait: float) -> int | None:
+    end = time.monotonic() + wait
+    while True:
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            return None
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= end:
+                        os.close(fd)
+                        return None
+                    time.sleep(0.05)
+            st = os.fstat(fd)
+            cur = os.stat(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            os.close(fd)
+            return None
+        else:
+            # the file may be removed as a stale entry while waiting
+            if (st.st_dev == cur.st_dev
+                and st.st_ino == cur.st_ino):
+                return fd
+        os.close(fd)
+
+
+def info_key(root: str, **kwargs: Any) -> str:
+    return hashlib.sha1(json.dumps([root, kwargs], sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+
+def tool_version(path: str, version: Callable[[], tuple[Any, ...]], **kwargs: Any) -> tuple[Any, ...]:
+    # recordings should contain the command
+    if (util._cassette.get() is not None
+        or (st := stamp(path)) is None):
+        return version()
+    elif ((c := _tools.get(path)) is not None
+          and c[0] == st):
+        return c[1]
+
+    name = None
+    if dir := _share_dir(**kwargs):
+        name = os.path.join(dir, f'tool-{hashlib.sha1(path.encode("utf-8")).hexdigest()}.json')
+        try:
+            with open(name, encoding='utf-8') as f:
+                o = json.load(f)
+            if (o['path'] == path
+                and o['stamp'] == st):
+                v = _tools[path] = (st, tuple(o['version']))
+                return v[1]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    rv = version()
+    _tools[path] = (st, rv)
+    if name:
+        try:
+            _dump(name, {'path': path, 'stamp': st, 'version': rv})
+        except OSError:
+            pass
+    return rv
+
+
+def _dump(path: str, o: Any) -> None:
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path).split('-', 1)[0] + '-', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(o, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _share_dir(**kwargs: Any) -> str | None:
+    if dir := cache_dir(**kwargs):
+        try:
+            os.makedirs(dir, exist_ok=True)
+        except OSError:
+            return None
+        return dir
+    return None
+
+
+class TagIndex:
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.stamp: Any = None
+        self.tags: dict[str, list[str]] = {}
+        self.data: dict[str, Any] = {}
+
+    @classmethod
+    def open(cls, scm: str, key: str, **kwargs: Any) -> TagIndex | None:
+        if not (dir := cache_dir(**kwargs)):
+            return None
+
+        h = hashlib.sha1(f'{scm}\0{key}'.encode()).hexdigest()
+        self = cls(os.path.join(dir, f'tags-{scm}-{h}.json'))
+        try:
+            with open(self.path, encoding='utf-8') as fp:
+                o = json.load(fp)
+            self.stamp = o['stamp']
+            self.tags = o['tags']
+            self.data = o.get('data', {})
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return self
+
+    def get(self, stamp: Sequence[Any]) -> dict[str, list[str]] | None:
+        return self.tags if self.stamp == list(stamp) else None
+
+    def update(self, stamp: Sequence[Any], tags: dict[str, list[str]], **data: Any) -> None:
+        self.stamp = list(stamp)
+        self.tags = tags
+        self.data = data
+        self.save()
+
+    def save(self) -> None:
+        dir = os.path.dirname(self.path)
+        try:
+            os.makedirs(dir, exist_ok=True)
+            _dump(self.path, {'stamp': self.stamp, 'tags': self.tags, 'data': self.data})
+        except OSError:
+            pass
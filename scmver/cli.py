@@ -7,22 +7,26 @@
 #
 
 from __future__ import annotations
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Iterator, Sequence
+import contextlib
 import re
-from typing import Any, TypeAlias
+from typing import TYPE_CHECKING, Any, TypeAlias
 
 try:
     import click
 except ImportError:
     raise SystemExit("Missing dependencies, try 'pip install scmver[cli]'")
 
-from . import __version__, core, setuptools
+from . import __version__
+
+if TYPE_CHECKING:
+    from . import core
 
 
 __all__ = ['run']
 
 F: TypeAlias = Callable[..., Any]
-LF: TypeAlias = Callable[[core.SCMInfo], str]
+LF: TypeAlias = Callable[['core.SCMInfo'], str]
 
 
 def run(args: Sequence[str] | None = None) -> None:
@@ -114,7 +118,12 @@ _stat_options = (
                  help='Regular expression to filter tags.'),
     click.option('--git-tag',
                  metavar='GLOB',
+                 multiple=True,
                  help='Glob pattern to filter tags.'),
+    click.option('--git-exclude',
+                 metavar='GLOB',
+                 multiple=True,
+                 help='Glob pattern to exclude tags.'),
     click.option('--hg-tag',
                  metavar='REGEX',
                  help='Regular expression to filter tags.'),
@@ -130,6 +139,23 @@ _stat_options = (
     click.option('--svn-tags',
                  metavar='PATH',
                  help='Relative repository path of the tags directory.'),
+    click.option('--tag-select',
+                 type=click.Choice(['scm-default', 'highest-pep440', 'newest']),
+                 help='Policy to select a tag from the tags of a revision.'),
+    click.option('--timeout',
+                 type=float,
+                 metavar='SECONDS',
+                 help='Time limit for each SCM command.'),
+    click.option('--deadline',
+                 type=float,
+                 metavar='SECONDS',
+                 help='Time limit for all SCM commands.'),
+    click.option('--server',
+                 metavar='SOCKET',
+                 help='Ask the server which is listening on the socket.'),
+    click.option('--trace',
+                 type=click.Path(dir_okay=False, writable=True),
+                 help='Write trace events in the Chrome trace event format.'),
 )
 
 
@@ -141,25 +167,52 @@ def cli() -> None:
 
 @cli.command()
 @click.argument('file',
+                nargs=-1,
                 type=click.Path(dir_okay=False, writable=True),
                 required=True)
 @_options(_next_version_options)
 @click.option('-t', '--template',
+              multiple=True,
               help='File template.')
+@click.option('-w', '--watch',
+              is_flag=True,
+              help='Regenerate files when the repository is changed.')
+@click.option('--interval',
+              type=float,
+              default=1.0,
+              metavar='SECONDS',
+              help='Polling interval for --watch.')
 @_options(_stat_options)
-def generate(file: str, template: str | None, **opts: Any) -> None:
-    """Generate a file with the version."""
+def generate(file: tuple[str, ...], template: tuple[str, ...], watch: bool, interval: float, **opts: Any) -> None:
+    """Generate files with the version.
+
+    TEMPLATE is used for all FILEs when it is specified once, otherwise each
+    TEMPLATE is used for the FILE at the same position.
+    """
+
+    if len(template) not in (0, 1, len(file)):
+        raise click.UsageError(f'{len(template)} templates for {len(file)} files')
+
+    from . import core
 
     opts = _merge_config(opts)
-    info = _stat('.', **opts)
-    if not info:
-        return
-    version = _next_version(info, **opts)
+    kwargs: list[dict[str, str]] = [{'template': t.replace('\\r\\n', '\n').replace('\\n', '\n')} for t in template] or [{}]
+    if len(kwargs) == 1:
+        kwargs *= len(file)
 
-    kwargs = {}
-    if template is not None:
-        kwargs['template'] = template.replace('\\r\\n', '\n').replace('\\n', '\n')
-    core.generate(file, version, info, **kwargs)
+    def render() -> None:
+        info = _stat('.', **opts)
+        if not info:
+            return
+        version = _next_version(info, **opts)
+        for path, kw in zip(file, kwargs):
+            core.generate(path, version, info, **kw)
+
+    with _tracing(opts['trace']):
+        if not watch:
+            render()
+        else:
+            _watch(render, interval)
 
 
 @cli.command()
@@ -172,6 +225,8 @@ def load(spec: str, path: str | None) -> None:
     SPEC is in the "package.module:some.attribute" format.
     """
 
+    from . import core
+
     click.echo(core.load_version(spec, path))
 
 
@@ -182,11 +237,26 @@ def next(**opts: Any) -> None:
     """Calculate a next version from the version."""
 
     opts = _merge_config(opts)
-    info = _stat('.', **opts)
-    if not info:
-        return
+    with _tracing(opts['trace']):
+        info = _stat('.', **opts)
+        if not info:
+            return
 
-    click.echo(_next_version(info, **opts))
+        click.echo(_next_version(info, **opts))
+
+
+@cli.command()
+@click.argument('socket',
+                type=click.Path(dir_okay=False))
+def serve(socket: str) -> None:
+    """Serve the working directory status over a Unix domain socket.
+
+    Results are cached until the SCM metadata of the repository is changed.
+    """
+
+    from . import server
+
+    server.serve(socket)
 
 
 @cli.command()
@@ -195,29 +265,83 @@ def stat(**opts: Any) -> None:
     """Show the working directory status."""
 
     opts = _merge_config(opts)
-    info = _stat('.', **opts)
-    if not info:
+    # lazy fields are resolved while tracing
+    with _tracing(opts['trace']):
+        info = _stat('.', **opts)
+        if not info:
+            return
+
+        if info.tag != '0.0':
+            click.echo(f'Tag:      {info.tag}')
+        click.echo(f'Distance: {info.distance}')
+        if info.revision:
+            click.echo(f'Revision: {info.revision}')
+        click.echo(f'Dirty:    {info.dirty}')
+        if info.branch:
+            click.echo(f'Branch:   {info.branch}')
+
+
+def _watch(func: Callable[[], None], interval: float) -> None:
+    import os
+    import time
+
+    from . import cache
+
+    root = os.path.abspath('.')
+    last = cache.fingerprint(root)
+    try:
+        func()
+        while True:
+            time.sleep(interval)
+            if (fp := cache.fingerprint(root)) == last:
+                continue
+            # wait until the repository settles down
+            while True:
+                time.sleep(interval)
+                if (v := cache.fingerprint(root)) == fp:
+                    break
+                fp = v
+            last = fp
+            try:
+                func()
+            except click.ClickException as e:
+                e.show()
+            except (OSError, ValueError) as e:
+                click.ClickException(str(e)).show()
+    except KeyboardInterrupt:
+        pass
+
+
+@contextlib.contextmanager
+def _tracing(path: str | None) -> Iterator[None]:
+    if not path:
+        yield
         return
 
-    if info.tag != '0.0':
-        click.echo(f'Tag:      {info.tag}')
-    click.echo(f'Distance: {info.distance}')
-    if info.revision:
-        click.echo(f'Revision: {info.revision}')
-    click.echo(f'Dirty:    {info.dirty}')
-    if info.branch:
-        click.echo(f'Branch:   {info.branch}')
+    from . import util
+
+    with util.trace() as events:
+        try:
+            yield
+        finally:
+            with open(path, 'w') as fp:
+                util.dump_trace(events, fp)
 
 
 def _merge_config(a: dict[str, Any]) -> dict[str, Any]:
+    from . import core, setuptools
+
     return (setuptools.load_cfg() or core.load_project() or {}) | a
 
 
 def _next_version(info: core.SCMInfo, **opts: Any) -> str | None:
+    from . import core, util
+
     kwargs = {k: opts[k]
               for k in ('spec', 'local', 'version')
               if opts[k] is not None}
-    return core.next_version(info, **kwargs)
+    with util.span('next_version'):
+        return core.next_version(info, **kwargs)
 
 
 def _stat(path: str, **opts: Any) -> core.SCMInfo | None:
@@ -227,11 +351,30 @@ def _stat(path: str, **opts: Any) -> core.SCMInfo | None:
                   ('darcs.tag', 'darcs_tag'),
                   ('fossil.tag', 'fsl_tag'),
                   ('git.tag', 'git_tag'),
+                  ('git.exclude', 'git_exclude'),
                   ('mercurial.tag', 'hg_tag'),
                   ('subversion.tag', 'svn_tag'),
                   ('subversion.trunk', 'svn_trunk'),
                   ('subversion.branches', 'svn_branches'),
                   ('subversion.tags', 'svn_tags'),
+                  ('tag_select', 'tag_select'),
+                  ('timeout', 'timeout'),
+                  ('deadline', 'deadline'),
               )
-              if opts[n] is not None}
-    return core.stat(path, **kwargs)
+              if opts[n] not in (None, ())}
+    # options which are only in the configuration
+    kwargs.update((k, opts[k]) for k in ('cache_dir', 'ceiling_dirs', 'one_filesystem') if opts.get(k) is not None)
+    if opts.get('server'):
+        from . import server
+
+        try:
+            return server.request(opts['server'], path, **kwargs)
+        except (OSError, ValueError) as e:
+            raise click.ClickException(str(e))
+
+    from . import core
+
+    try:
+        return core.stat(path, **kwargs)
+    except TimeoutError as e:
+        raise click.ClickException(str(e))
@@ -7,20 +7,28 @@
 #
 
 from __future__ import annotations
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+import contextvars
 import datetime
+import functools
 import importlib
 import os
 import re
+import string
 import sys
 import textwrap
-from typing import cast, Any, NamedTuple
+import time
+from typing import cast, Any, ClassVar, NamedTuple, TypeAlias, TypeVar
 
+from . import util
 from ._typing import Path, Segment, RawSegment
 
 
-__all__ = ['generate', 'get_version', 'load_version', 'next_version', 'load_project', 'stat',
-           'SCMInfo', 'Version', 'VersionError']
+__all__ = ['generate', 'get_version', 'load_version', 'next_version', 'load_project', 'select_tag', 'stat',
+           'SCMInfo', 'LazySCMInfo', 'Version', 'FrozenVersion', 'VersionError']
+
+_Fields: TypeAlias = tuple[int, tuple[int, ...], RawSegment | None, RawSegment | None, RawSegment | None, str | None]
+_L = TypeVar('_L', bound='LazySCMInfo')
 
 _TEMPLATE = textwrap.dedent("""\
     # file generated by scmver; DO NOT EDIT.
@@ -73,22 +81,106 @@ _pep440_re = re.compile(r"""
     (?:
         \+
         (?P<local>
-            [a-z0-9] (?:[a-z0-9-_.]* [a-z0-9])?
+            [a-z0-9]+ (?:[-_.] [a-z0-9]+)*
         )
     )?
     \Z
 """, re.IGNORECASE | re.VERBOSE)
 _sep_re = re.compile(r'[-._]')
+_PRE = {
+    'a': 'a',
+    'alpha': 'a',
+    'b': 'b',
+    'beta': 'b',
+    'c': 'rc',
+    'pre': 'rc',
+    'preview': 'rc',
+    'rc': 'rc',
+}
 _version_re = re.compile(r'(?P<version>v?\d+.*)\Z')
+# update
+_SPEC = {
+    'major': ('release', 0),
+    'minor': ('release', 1),
+    'micro': ('release', 2),
+    'patch': ('release', 2),
+    'major.dev': ('release.dev', 0),
+    'minor.dev': ('release.dev', 1),
+    'micro.dev': ('release.dev', 2),
+    'patch.dev': ('release.dev', 2),
+    'pre': ('pre', 0),
+    'post': ('post', 0),
+    'dev': ('dev', 0),
+}
+# stat
+_projects: dict[str, tuple[tuple[int, int], dict[str, Any] | None]] = {}
+_outside: dict[tuple[Any, ...], list[tuple[str, int | None]]] = {}
+
+_IMPLS = (('.bzr', 'bazaar'), ('_darcs', 'darcs'), ('.fslckout', 'fossil'), ('_FOSSIL_', 'fossil'),
+          ('.git', 'git'), ('.hg', 'mercurial'), ('.hg_archival.txt', 'mercurial'), ('.svn', 'subversion'))
+_STAT = frozenset(('timeout', 'deadline', 'tag_select', 'cache_dir', 'ttl', 'ceiling_dirs', 'one_filesystem'))
+_SELECT = ('scm-default', 'highest-pep440', 'newest')
 
 
 def generate(path: Path, version: str | None, info: SCMInfo | None = None, template: str = _TEMPLATE) -> None:
     kwargs: dict[str, Any] = {'version': version or ''}
     if info:
-        kwargs.update(revision=info.revision or '',
-                      branch=info.branch or '')
-    with open(path, 'w') as fp:
-        fp.write(template.format(**kwargs))
+        # fields which are not referenced are not resolved
+        for k in _names(template) & {'revision', 'branch'}:
+            kwargs[k] = getattr(info, k) or ''
+    _write(path, template.format(**kwargs))
+
+
+def _names(format: str) -> set[str]:
+    rv = set()
+    for _, name, spec, _ in string.Formatter().parse(format):
+        if name is not None:
+            rv.add(re.split(r'[.\[]', name, maxsplit=1)[0])
+        if spec:
+            rv |= _names(spec)
+    return rv
+
+
+def _outputs(write_to: Any, template: str = _TEMPLATE) -> list[tuple[Path, str]]:
+    if isinstance(write_to, (str, os.PathLike)):
+        return [(write_to, template)]
+
+    rv: list[tuple[Path, str]] = []
+    for o in write_to:
+        if isinstance(o, (str, os.PathLike)):
+            rv.append((o, template))
+        elif (isinstance(o, Mapping)
+              and 'path' in o):
+            rv.append((o['path'], o.get('template', template)))
+        elif (isinstance(o, Sequence)
+              and len(o) == 2):
+            rv.append((o[0], o[1]))
+        else:
+            raise ValueError(f'invalid write_to: {o!r}')
+    return rv
+
+
+def _write(path: Path, data: str) -> bool:
+    try:
+        with open(path, newline='') as fp:
+            if fp.read() == data.replace('\n', os.linesep):
+                return False
+        mode = os.stat(path).st_mode & 0o7777
+    except (OSError, ValueError):
+        mode = None
+
+    tmp = f'{path}.{os.urandom(4).hex()}.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            fp.write(data)
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
 
 
 def get_version(root: Path = '.', **kwargs: Any) -> str | None:
@@ -96,10 +188,27 @@ def get_version(root: Path = '.', **kwargs: Any) -> str | None:
         return {k: d[k] for k in d if k in keys}
 
     root = os.path.abspath(root)
-    if info := stat(root, **{k: kwargs[k] for k in kwargs if k.endswith('.tag')}):
-        version = next_version(info, **take(kwargs, 'spec', 'local', 'version'))
+    # fields of SCMInfo which are used
+    local = kwargs.get('local', '{local:%Y-%m-%d}')
+    if callable(local):
+        fields = None
+    else:
+        fields = {'tag', 'distance', 'dirty'} | _names(local) & {'revision', 'branch'}
         if 'write_to' in kwargs:
-            generate(os.path.join(root, kwargs['write_to']), version, info, **take(kwargs, 'template'))
+            for _, template in _outputs(kwargs['write_to'], kwargs.get('template', _TEMPLATE)):
+                fields |= _names(template) & {'revision', 'branch'}
+    try:
+        info = _stat(root, fields, **{k: kwargs[k] for k in kwargs if '.' in k or k in _STAT})
+    except TimeoutError:
+        if 'fallback' not in kwargs:
+            raise
+        info = None
+    if info:
+        with util.span('next_version'):
+            version = next_version(info, **take(kwargs, 'spec', 'local', 'version'))
+        if 'write_to' in kwargs:
+            for path, template in _outputs(kwargs['write_to'], kwargs.get('template', _TEMPLATE)):
+                generate(os.path.join(root, path), version, info, template)
         return version
     elif 'fallback' in kwargs:
         fallback = kwargs['fallback']
@@ -133,20 +242,23 @@ def load_version(spec: str, path: Path | None = None) -> str:
 
 def next_version(info: SCMInfo, spec: str = 'post', local: str | Callable[[SCMInfo], str] = '{local:%Y-%m-%d}',
                  version: re.Pattern[str] = _version_re) -> str | None:
-    m = version.search(info.tag)
-    if not m:
-        raise VersionError('cannot parse version from SCM tag')
+    if (version is _version_re
+        and _release_of(info.tag)):
+        pv = Version(info.tag)
+    else:
+        m = version.search(info.tag)
+        if not m:
+            raise VersionError('cannot parse version from SCM tag')
 
-    pv = Version(m.group('version'))
+        pv = Version(m.group('version'))
     if info.distance > 0:
         pv.update(spec, info.distance)
 
     if callable(local):
         lv = local(info)
     elif info.dirty:
-        lv = local.format(distance=info.distance,
-                          revision=info.revision,
-                          branch=info.branch,
+        names = _names(local)
+        lv = local.format(**{k: getattr(info, k) for k in names & {'distance', 'revision', 'branch'}},
                           utc=datetime.datetime.now(datetime.timezone.utc),
                           local=datetime.datetime.now())
     else:
@@ -155,6 +267,29 @@ def next_version(info: SCMInfo, spec: str = 'post', local: str | Callable[[SCMIn
 
 
 def load_project(path: Path = 'pyproject.toml') -> dict[str, Any] | None:
+    if not os.path.isfile(path):
+        return None
+
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    if (c := _projects.get(path)) is None or c[0] != key:
+        with open(path, 'rb') as fp:
+            data = fp.read()
+        # skip parsing when it cannot have the scmver table
+        if b'scmver' not in data:
+            c = _projects[path] = (key, None)
+        elif (toml := _toml()) is None:
+            return None
+        else:
+            c = _projects[path] = (key, _load_project(path, toml.loads(data.decode('utf-8'))))
+    if (c[1] is None
+        or _toml() is None):
+        return None
+    return dict(c[1])
+
+
+def _toml() -> Any:
     try:
         if sys.version_info >= (3, 11):
             import tomllib as toml
@@ -162,22 +297,27 @@ def load_project(path: Path = 'pyproject.toml') -> dict[str, Any] | None:
             import tomli as toml
     except ImportError:
         return None
+    return toml
 
-    if not os.path.isfile(path):
-        return None
-    with open(path, 'rb') as fp:
-        proj = toml.load(fp)
+
+def _load_project(path: str, proj: dict[str, Any]) -> dict[str, Any] | None:
     if not ('tool' in proj
             and 'scmver' in proj['tool']):
         return None
 
     scmver: dict[str, Any] = proj['tool']['scmver']
     # root
-    root = os.path.dirname(os.path.abspath(path))
+    root = os.path.dirname(path)
     scmver['root'] = os.path.join(root, scmver['root']) if 'root' in scmver else root
-    # write-to
-    if 'write-to' in scmver:
-        scmver['write_to'] = scmver.pop('write-to')
+    # write-to, tag-select, cache-dir, ceiling-dirs, one-filesystem
+    for k in ('write-to', 'tag-select', 'cache-dir', 'ceiling-dirs', 'one-filesystem'):
+        if k in scmver:
+            scmver[k.replace('-', '_')] = scmver.pop(k)
+    if 'cache_dir' in scmver:
+        scmver['cache_dir'] = os.path.join(root, scmver['cache_dir'])
+    if 'ceiling_dirs' in scmver:
+        dirs = scmver['ceiling_dirs']
+        scmver['ceiling_dirs'] = [os.path.join(root, p) for p in ([dirs] if isinstance(dirs, str) else dirs)]
     # fallback
     if ('fallback' in scmver
         and isinstance(scmver['fallback'], Mapping)):
@@ -190,26 +330,148 @@ def load_project(path: Path = 'pyproject.toml') -> dict[str, Any] | None:
     return scmver
 
 
+def select_tag(tags: Sequence[str], select: str = 'scm-default') -> str | None:
+    if select not in _SELECT:
+        raise ValueError(f'invalid tag selection: {select!r}')
+    elif not tags:
+        return None
+    elif select == 'highest-pep440':
+        # tags which are versions take precedence over tags which contain versions
+        tag = None
+        key: tuple[Any, ...] = ()
+        for t in tags:
+            vers = [(1, t)]
+            if m := _version_re.search(t):
+                vers.append((0, m.group('version')))
+            for i, v in vers:
+                try:
+                    k = (i, Version(v).sort_key)
+                except VersionError:
+                    continue
+                if (tag is None
+                    or k > key):
+                    tag = t
+                    key = k
+                break
+        if tag is not None:
+            return tag
+    return tags[0]
+
+
 def stat(path: Path, **kwargs: Any) -> SCMInfo | None:
+    if (ttl := kwargs.pop('ttl', None)) is not None:
+        from . import cache
+
+        def resolve() -> SCMInfo | None:
+            # memoized entries are shared between threads
+            info = stat(path, **kwargs)
+            return info.resolve() if isinstance(info, LazySCMInfo) else info
+
+        path = os.path.abspath(path)
+        return cache.memoize(repr((path, sorted(kwargs.items()))), float(ttl), resolve)
+
     import importlib.metadata
 
-    impls = tuple((ep.name, ep.load()) for ep in importlib.metadata.entry_points(group='scmver.parse'))
-    if not impls:
-        from . import bazaar as bzr, darcs, fossil as fsl, git, mercurial as hg, subversion as svn
+    with util.span('discovery'):
+        # backends are imported when their metadata is found
+        impls: tuple[tuple[str, Callable[[], Callable[..., SCMInfo | None]]], ...]
+        impls = tuple((ep.name, ep.load) for ep in importlib.metadata.entry_points(group='scmver.parse'))
+        if not impls:
+            impls = tuple((name, functools.partial(_backend, mod)) for name, mod in _IMPLS)
 
-        impls = (('.bzr', bzr.parse), ('_darcs', darcs.parse), ('.fslckout', fsl.parse), ('_FOSSIL_', fsl.parse),
-                 ('.git', git.parse), ('.hg', hg.parse), ('.hg_archival.txt', hg.parse), ('.svn', svn.parse))
+    if kwargs.get('tag_select', 'scm-default') not in _SELECT:
+        raise ValueError(f'invalid tag selection: {kwargs["tag_select"]!r}')
 
     path = os.path.abspath(path)
-    while True:
-        for name, parse in impls:
-            if (kwargs.get(name, True)
-                and os.path.exists(os.path.join(path, name))):
-                if info := parse(path, name=name, **kwargs):
-                    return info
-        p, path = path, os.path.dirname(path)
-        if path == p:
-            return None
+    impls = tuple((name, load) for name, load in impls if kwargs.get(name, True))
+    ceiling_dirs = kwargs.get('ceiling_dirs')
+    one_filesystem = kwargs.get('one_filesystem', False)
+    # directories which are known to be outside of working directories
+    key = (path, repr(ceiling_dirs), os.environ.get('SCMVER_CEILING_DIRECTORIES'), one_filesystem, tuple(name for name, _ in impls))
+    if ((dirs := _outside.get(key)) is not None
+        and all(_mtime(p) == m for p, m in dirs)):
+        return None
+
+    with (util.span('stat', path=path),
+          util.limit(_seconds(kwargs.get('timeout')), _seconds(kwargs.get('deadline')))):
+        dirs = []
+        found = False
+        for p in util.parents(path, ceiling_dirs, one_filesystem):
+            dirs.append((p, _mtime(p)))
+            for name, load in impls:
+                if os.path.exists(os.path.join(p, name)):
+                    with util.span('parse', scm=name, path=p):
+                        info = load()(p, name=name, **kwargs)
+                    if info:
+                        return info
+                    found = True
+        # a directory which has been modified recently may be modified again
+        # within the resolution of its mtime
+        racy = time.time_ns() - 2_000_000_000
+        if (not found
+            and all(m is not None and m < racy for _, m in dirs)):
+            _outside[key] = dirs
+        return None
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _stat(root: str, fields: Iterable[str] | None = None, **kwargs: Any) -> SCMInfo | None:
+    from . import cache
+
+    # share the status between the processes which use the same cache
+    # directory
+    if (kwargs.get('ttl') is not None
+        or not cache.cache_dir(**kwargs)
+        or (fp := cache.fingerprint(root, **kwargs)) is None
+        or (dirty := _dirty_of(fp, **kwargs)) is None):
+        return stat(root, **kwargs)
+    fields = sorted(fields) if fields is not None else None
+    key = cache.info_key(root, fields=fields, **kwargs)
+    hit, v = cache.load_info(key, fp, **kwargs)
+    if not hit:
+        with cache.lock(key, **kwargs):
+            # another process may have saved it while waiting
+            hit, v = cache.load_info(key, fp, **kwargs)
+            if not hit:
+                info = stat(root, **kwargs)
+                if isinstance(info, LazySCMInfo):
+                    info = info.resolve(fields)
+                cache.save_info(key, fp, info, **kwargs)
+                return info
+    if v is None:
+        return None
+    # the fingerprint does not cover the working tree
+    d = dirty()
+    return SCMInfo(*v)._replace(dirty=d) if d is not None else stat(root, **kwargs)
+
+
+def _dirty_of(fp: Sequence[Any], **kwargs: Any) -> Callable[[], bool | None] | None:
+    names = [v for v in fp[1:] if isinstance(v, str)]
+    if (len(names) != 1
+        or not kwargs.get(names[0], True)
+        or (mod := dict(_IMPLS).get(names[0])) is None
+        or (func := getattr(importlib.import_module(f'.{mod}', __package__), 'dirty', None)) is None):
+        return None
+
+    def dirty() -> bool | None:
+        with util.limit(_seconds(kwargs.get('timeout')), _seconds(kwargs.get('deadline'))):
+            return cast(bool | None, func(fp[0], name=names[0], **kwargs))
+
+    return dirty
+
+
+def _backend(mod: str) -> Callable[..., SCMInfo | None]:
+    return cast(Callable[..., SCMInfo | None], importlib.import_module(f'.{mod}', __package__).parse)
+
+
+def _seconds(value: float | str | None) -> float | None:
+    return float(value) if value is not None else None
 
 
 class SCMInfo(NamedTuple):
@@ -221,26 +483,141 @@ class SCMInfo(NamedTuple):
     branch: str | None = None
 
 
+def _field(i: int, name: str) -> property:
+    def get(self: LazySCMInfo) -> Any:
+        if (f := self._thunks.get(name)) is not None:
+            self._values[name] = self._context.copy().run(_run, f)
+            self._thunks.pop(name, None)
+        return self._values[name] if name in self._values else tuple.__getitem__(self, i)
+
+    return property(get)
+
+
+def _run(f: Callable[[], Any]) -> Any:
+    # the deadline of stat has passed when fields are used later
+    util._limit.set((util._limit.get()[0], None))
+    return f()
+
+
+class LazySCMInfo(SCMInfo):
+
+    # _make does not call __new__
+    _thunks: dict[str, Callable[[], Any]] = {}
+    _values: dict[str, Any] = {}
+    _context: contextvars.Context
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> LazySCMInfo:
+        # callable fields are resolved on first access
+        thunks = {k: kwargs.pop(k) for k in tuple(kwargs) if callable(kwargs[k])}
+        kwargs.update((k, SCMInfo._field_defaults[k]) for k in thunks)
+        self = super().__new__(cls, *args, **kwargs)
+        self._thunks = thunks
+        self._values = {}
+        self._context = contextvars.copy_context()
+        return self
+
+    tag = _field(0, 'tag')
+    distance = _field(1, 'distance')
+    revision = _field(2, 'revision')
+    dirty = _field(3, 'dirty')
+    branch = _field(4, 'branch')
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, k) for k in self._fields)
+
+    def __getitem__(self, key: Any) -> Any:
+        return tuple(self)[key]
+
+    def __eq__(self, other: object) -> bool:
+        return tuple(self) == (tuple(other) if isinstance(other, tuple) else other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return repr(self.resolve())
+
+    def __reduce__(self) -> tuple[type[SCMInfo], tuple[Any, ...]]:
+        return (SCMInfo, tuple(self))
+
+    def _replace(self: _L, **kwargs: Any) -> _L:
+        return type(self)(*(kwargs.pop(k, v) for k, v in zip(self._fields, self)))
+
+    def resolve(self, fields: Iterable[str] | None = None) -> SCMInfo:
+        if fields is None:
+            return SCMInfo(*self)
+        return SCMInfo(**{k: getattr(self, k) for k in fields})
+
+
 class Version:
 
-    __slots__ = ('epoch', 'release', '_pre', '_post', '_dev', 'local')
+    __slots__ = ('_epoch', '_release', '_pre', '_post', '_dev', '_local', '_key')
 
+    _epoch: int
+    _release: tuple[int, ...]
     _pre: RawSegment | None
     _post: RawSegment | None
     _dev: RawSegment | None
+    _local: str | None
+    _key: tuple[Any, ...] | None
 
     def __init__(self, version: str) -> None:
-        m = _pep440_re.match(version.strip())
-        if not m:
-            raise VersionError(f'invalid version: {version!r}')
-
-        self.epoch = int(m.group('epoch')) if m.group('epoch') else 0
-        self.release = tuple(map(int, m.group('release').split('.')))
-        for g in ('pre', 'post', 'dev'):
-            s = m.group(f'{g}_s')
-            n = m.group(f'{g}_n')
-            setattr(self, f'_{g}', (m.group(f'{g}_sep') or '', s, m.group(f'{g}_opt_sep') or '', int(n) if n else -1) if s or n else None)
-        self.local = m.group('local')
+        self._epoch, self._release, self._pre, self._post, self._dev, self._local = _parse(version)
+        self._key = None
+
+    @classmethod
+    def _of(cls, fields: _Fields) -> Version:
+        self = cls.__new__(cls)
+        self._epoch, self._release, self._pre, self._post, self._dev, self._local = fields
+        self._key = None
+        return self
+
+    @classmethod
+    def parse_many(cls, versions: Iterable[str]) -> Iterator[Version | VersionError]:
+        for v in versions:
+            try:
+                yield cls._of(_parse(v))
+            except VersionError as e:
+                yield e
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return (self._key or self._sort_key()) == (other._key or other._sort_key())
+
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return (self._key or self._sort_key()) != (other._key or other._sort_key())
+
+    def __lt__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return (self._key or self._sort_key()) < (other._key or other._sort_key())
+
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return (self._key or self._sort_key()) <= (other._key or other._sort_key())
+
+    def __gt__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return (self._key or self._sort_key()) > (other._key or other._sort_key())
+
+    def __ge__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return (self._key or self._sort_key()) >= (other._key or other._sort_key())
+
+    # FrozenVersion is hashable
+    __hash__: ClassVar[Callable[[object], int] | None] = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> tuple[type[Version], tuple[str]]:
+        return (self.__class__, (str(self),))
 
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__}({self})>'
@@ -250,9 +627,9 @@ class Version:
             return (v[0], v[1], v[2], str(v[3]) if v[3] >= 0 else '')
 
         buf = []
-        if self.epoch != 0:
-            buf.append(f'{self.epoch}!')
-        buf.append('.'.join(map(str, self.release)))
+        if self._epoch != 0:
+            buf.append(f'{self._epoch}!')
+        buf.append('.'.join(map(str, self._release)))
         if self._pre:
             buf += seg(self._pre)
         if self._post:
@@ -262,10 +639,28 @@ class Version:
                 buf.append(f'-{self._post[3]}')
         if self._dev:
             buf += seg(self._dev)
-        if self.local:
-            buf.append(f'+{self.local}')
+        if self._local:
+            buf.append(f'+{self._local}')
         return ''.join(buf)
 
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    @epoch.setter
+    def epoch(self, value: int) -> None:
+        self._epoch = value
+        self._key = None
+
+    @property
+    def release(self) -> tuple[int, ...]:
+        return self._release
+
+    @release.setter
+    def release(self, value: tuple[int, ...]) -> None:
+        self._release = value
+        self._key = None
+
     @property
     def pre(self) -> Segment | None:
         return self._pre[1::2] if self._pre else None
@@ -278,88 +673,204 @@ class Version:
     def dev(self) -> Segment | None:
         return self._dev[1::2] if self._dev else None
 
+    @property
+    def local(self) -> str | None:
+        return self._local
+
+    @local.setter
+    def local(self, value: str | None) -> None:
+        self._local = value
+        self._key = None
+
+    @property
+    def sort_key(self) -> tuple[Any, ...]:
+        return self._key or self._sort_key()
+
+    def _sort_key(self) -> tuple[Any, ...]:
+        self._key = _sort_key(self._fields())
+        return self._key
+
+    def _fields(self) -> _Fields:
+        return (self._epoch, self._release, self._pre, self._post, self._dev, self._local)
+
+    def freeze(self) -> FrozenVersion:
+        return FrozenVersion._of(self._fields())
+
     def normalize(self) -> Version:
-        def seg(s: str, v: RawSegment, sep: str = '.') -> RawSegment:
-            return (sep, s, '', v[3] if v[3] >= 0 else 0)
-
-        v = self.__class__(str(self).lower())
-        if v._pre:
-            s = v._pre[1]
-            if s == 'alpha':
-                s = 'a'
-            elif s == 'beta':
-                s = 'b'
-            elif s in ('c', 'pre', 'preview'):
-                s = 'rc'
-            v._pre = seg(s, v._pre, sep='')
-        if v._post:
-            v._post = seg('post', v._post)
-        if v._dev:
-            v._dev = seg('dev', v._dev)
-        if v.local:
-            v.local = '.'.join(str(int(s)) if s.isdigit() else s for s in _sep_re.split(v.local))
-        return v
+        pre = self._pre
+        post = self._post
+        dev = self._dev
+        local = self._local
+        return self._of((self._epoch,
+                         self._release,
+                         ('', _PRE[pre[1].lower()], '', max(pre[3], 0)) if pre else None,
+                         ('.', 'post', '', max(post[3], 0)) if post else None,
+                         ('.', 'dev', '', max(dev[3], 0)) if dev else None,
+                         '.'.join(str(int(s)) if s.isdigit() else s for s in _sep_re.split(local.lower())) if local else None))
 
     def update(self, spec: str, value: int = 1) -> None:
-        if self.local:
+        if self._local:
             raise VersionError('local version identifiers exists')
 
-        def update(ver: int, val: int) -> int:
-            if ver < 0:
-                return val if val > 0 else -1
-            return ver + val
-
-        def zero(v: int) -> int:
-            return v if v >= 0 else 0
+        op = _SPEC.get(spec) or _SPEC.get(spec.lower())
+        if op is None:
+            if spec.lower().endswith('.dev'):
+                raise VersionError('invalid segment specifier')
+            return
 
-        spec = spec.lower()
-        if spec == 'major':
-            self.release = (zero(self.release[0] + value),) + self.release[1:]
-            self._pre = self._post = self._dev = None
-        elif spec == 'minor':
-            if len(self.release) < 2:
-                self.release += (zero(value),)
+        seg, i = op
+        if seg == 'release':
+            r = self._release
+            if len(r) <= i:
+                self._release = r + (0,) * (i - len(r)) + (max(value, 0),)
             else:
-                self.release = self.release[:1] + (zero(self.release[1] + value),) + self.release[2:]
+                self._release = r[:i] + (max(r[i] + value, 0),) + r[i + 1:]
             self._pre = self._post = self._dev = None
-        elif spec in ('micro', 'patch'):
-            if len(self.release) < 2:
-                self.release += (0, zero(value),)
-            elif len(self.release) < 3:
-                self.release += (zero(value),)
+        elif seg == 'release.dev':
+            if value < 0:
+                raise VersionError('invalid value')
+
+            r = self._release
+            if len(r) <= i:
+                self._release = r + (0,) * (i - len(r)) + (1,)
             else:
-                self.release = self.release[:2] + (zero(self.release[2] + value),) + self.release[3:]
-            self._pre = self._post = self._dev = None
-        elif spec in ('pre', 'dev'):
-            v = getattr(self, f'_{spec}')
-            if not v:
-                raise VersionError(f'{"pre-" if spec != "dev" else "development "}release segment does not exist')
-            setattr(self, f'_{spec}', v[:3] + (update(v[3], value),))
-        elif spec == 'post':
-            if self._post:
-                if self._post[1]:
-                    self._post = self._post[:3] + (update(self._post[3], value),)
+                self._release = r[:i] + (r[i] + 1,) + (0,) * (len(r) - i - 1)
+            self._pre = self._post = None
+            self._dev = ('.', 'dev', '', value if value > 1 else -1)
+        elif seg == 'post':
+            if v := self._post:
+                if v[1]:
+                    self._post = (v[0], v[1], v[2], _add(v[3], value))
                 else:
-                    self._post = self._post[:3] + (zero(self._post[3] + value),)
+                    self._post = (v[0], v[1], v[2], max(v[3] + value, 0))
             elif value >= 0:
                 self._post = ('.', 'post', '', value if value > 1 else -1)
-        elif spec.endswith('.dev'):
-            spec = spec[:-len('.dev')]
-            if spec == 'major':
-                i = 1
-            elif spec == 'minor':
-                i = 2
-            elif spec in ('micro', 'patch'):
-                i = 3
-            else:
-                raise VersionError('invalid segment specifier')
-            if value < 0:
-                raise VersionError('invalid value')
+        elif seg == 'pre':
+            if not (v := self._pre):
+                raise VersionError('pre-release segment does not exist')
+            self._pre = (v[0], v[1], v[2], _add(v[3], value))
+        else:
+            if not (v := self._dev):
+                raise VersionError('development release segment does not exist')
+            self._dev = (v[0], v[1], v[2], _add(v[3], value))
+        self._key = None
 
-            self.release = self.release[:i] + (0,) * (len(self.release) - i)
-            self.update(spec)
-            self._dev = ('.', 'dev', '', value if value > 1 else -1)
+
+class FrozenVersion(Version):
+
+    __slots__ = ('_str',)
+
+    _str: str | None
+
+    def __init__(self, version: str) -> None:
+        self._init(_parse(version))
+
+    @classmethod
+    def _of(cls, fields: _Fields) -> FrozenVersion:
+        self = cls.__new__(cls)
+        self._init(fields)
+        return self
+
+    def _init(self, fields: _Fields) -> None:
+        for k, v in zip(Version.__slots__, fields):
+            object.__setattr__(self, k, v)
+        object.__setattr__(self, '_key', _sort_key(fields))
+        object.__setattr__(self, '_str', None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{self.__class__.__name__!r} object is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{self.__class__.__name__!r} object is immutable')
+
+    def __hash__(self) -> int:
+        return hash(self.sort_key)
+
+    def __str__(self) -> str:
+        if self._str is None:
+            object.__setattr__(self, '_str', super().__str__())
+        return cast(str, self._str)
+
+    def freeze(self) -> FrozenVersion:
+        return self
+
+    def thaw(self) -> Version:
+        v = Version._of(self._fields())
+        v._key = self._key
+        return v
+
+    def normalize(self) -> FrozenVersion:
+        return cast(FrozenVersion, super().normalize())
+
+    def update(self, spec: str, value: int = 1) -> None:
+        raise AttributeError(f'{self.__class__.__name__!r} object is immutable')
+
+    def bump(self, spec: str, value: int = 1) -> FrozenVersion:
+        v = self.thaw()
+        v.update(spec, value)
+        return v.freeze()
 
 
 class VersionError(ValueError):
     pass
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse(version: str) -> _Fields:
+    # fast path for release segment only
+    if release := _release_of(version):
+        return (0, release, None, None, None, None)
+
+    m = _pep440_re.match(version.strip())
+    if not m:
+        raise VersionError(f'invalid version: {version!r}')
+
+    seg: list[RawSegment | None] = []
+    for g in ('pre', 'post', 'dev'):
+        s = m.group(f'{g}_s')
+        n = m.group(f'{g}_n')
+        seg.append((m.group(f'{g}_sep') or '', s, m.group(f'{g}_opt_sep') or '', int(n) if n else -1) if s or n else None)
+    return (int(m.group('epoch')) if m.group('epoch') else 0,
+            tuple(map(int, m.group('release').split('.'))),
+            seg[0], seg[1], seg[2],
+            m.group('local'))
+
+
+def _add(n: int, value: int) -> int:
+    if n < 0:
+        return value if value > 0 else -1
+    return n + value
+
+
+def _release_of(version: str) -> tuple[int, ...] | None:
+    version = version.strip()
+    if version[:1] in ('v', 'V'):
+        version = version[1:]
+    if version.isascii():
+        v = version.split('.')
+        if all(map(str.isdigit, v)):
+            return tuple(map(int, v))
+    return None
+
+
+def _sort_key(fields: _Fields) -> tuple[Any, ...]:
+    epoch, release, pre, post, dev, local = fields
+    # release segment without trailing zeros
+    i = len(release)
+    while i > 0 and release[i - 1] == 0:
+        i -= 1
+    # pre-release segment: development releases of final releases < pre-releases < final releases
+    if pre:
+        pre_k = (1, _PRE[pre[1].lower()], max(pre[3], 0))
+    elif dev and not post:
+        pre_k = (0, '', 0)
+    else:
+        pre_k = (2, '', 0)
+    # local version identifiers: alphanumeric segments < numeric segments
+    local_k = tuple((1, int(s), '') if s.isdigit() else (0, 0, s.lower()) for s in _sep_re.split(local)) if local else ()
+    return (epoch,
+            release[:i],
+            pre_k,
+            max(post[3], 0) if post else -1,
+            (0, max(dev[3], 0)) if dev else (1, 0),
+            local_k)
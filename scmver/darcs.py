@@ -12,13 +12,14 @@ import re
 import sys
 from typing import cast, Any
 
-from . import core, util
+from . import cache, core, util
 from ._typing import Path
 
 
 __all__ = ['parse', 'version', 'run']
 
 _TAG = 'darcs.tag'
+_SELECT = 'tag_select'
 # environ
 _env: tuple[str, ...] = ('DARCS_TESTING_PREFS_DIR', 'DARCS_TMPDIR', 'TMPDIR')
 if sys.platform == 'win32':
@@ -51,10 +52,18 @@ def parse(root: Path, name: str | None = '_darcs', **kwargs: Any) -> core.SCMInf
             return core.SCMInfo(dirty=dirty, branch=branch)
 
         tag_re = re.compile(kwargs[_TAG]) if _TAG in kwargs else None
-        for tag in run('show', 'tags')[0].splitlines():
+        select = kwargs.get(_SELECT, 'scm-default')
+        # tags are listed from newest to oldest
+        tags = []
+        for tag in _tags_of(root, **kwargs):
             if (not tag_re
                 or tag_re.match(tag)):
-                return core.SCMInfo(tag, _distance_of(root, tag), info['Weak Hash'], dirty, branch)
+                tags.append(tag)
+                if select != 'highest-pep440':
+                    break
+        if tags:
+            tag = cast(str, core.select_tag(tags, select))
+            return core.SCMInfo(tag, _distance_of(root, tag), info['Weak Hash'], dirty, branch)
         return core.SCMInfo(distance=int(info['Num Patches']),
                             revision=info['Weak Hash'],
                             dirty=dirty,
@@ -67,6 +76,25 @@ def _show_repo(root: Path) -> dict[str, str]:
     return dict(cast(tuple[str, str], (s.strip() for s in l.split(':', 1))) for l in out)
 
 
+def _tags_of(root: Path, **kwargs: Any) -> list[str]:
+    # tags are patches, and they are not bound to revisions
+    index = cache.TagIndex.open('darcs', os.path.abspath(root), **kwargs)
+    st = None
+    if index:
+        for n in ('hashed_inventory', 'inventory'):
+            if st := cache.stamp(os.path.join(root, '_darcs', n)):
+                break
+        if (st
+            and (tags := index.get(st)) is not None):
+            return tags.get('', [])
+
+    out = run('show', 'tags', cwd=root)[0].splitlines()
+    if (index
+        and st):
+        index.update(st, {'': out})
+    return out
+
+
 def _distance_of(root: Path, tag: str) -> int:
     return int(run('log', '--from-tag', tag, '--count', cwd=root)[0]) - 1
 
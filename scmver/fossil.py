@@ -10,15 +10,16 @@ from __future__ import annotations
 import os
 import re
 import sys
-from typing import Any
+from typing import cast, Any
 
-from . import core, util
+from . import cache, core, util
 from ._typing import Path
 
 
 __all__ = ['parse', 'version', 'run']
 
 _TAG = 'fossil.tag'
+_SELECT = 'tag_select'
 # environ
 _env: tuple[str, ...] = ('FOSSIL_HOME', 'FOSSIL_USER', 'SQLITE_TMPDIR', 'USER', 'LOGNAME', 'USERNAME', 'TMPDIR')
 if sys.platform == 'win32':
@@ -74,22 +75,38 @@ def parse(root: Path, name: str | None = '.fslckout', **kwargs: Any) -> core.SCM
         dirty = bool(changes)
         branch = _branch_of(root) or _branch_of(root, closed=True)
 
-        # NOTE: "-n 0" does not work with <= 1.36
-        distance = 0
-        tag_re = re.compile(kwargs[_TAG]) if _TAG in kwargs else None
-        for l in run('timeline', 'parents', 'current', '-n', str(0x7fff), '-t', 'ci', '-W', '0', cwd=root)[0].splitlines():
-            m = _timeline_re.match(l)
-            if not m:
-                continue
-            elif (m.group('tags')
-                  and len(m.group('tags').split(',')) > 1):
-                for tag in run('tag', 'list', m.group('check_in'), cwd=root)[0].splitlines():
-                    if (tag != branch
-                        and not tag.startswith('branch=')
-                        and (not tag_re
-                             or tag_re.match(tag))):
+        index = cache.TagIndex.open('fossil', info['repository'], **kwargs) if 'repository' in info else None
+        st = cache.stamp(info['repository']) if index else None
+        known = (index.get(st) if index and st else None) or {}
+        n = len(known)
+        try:
+            # NOTE: "-n 0" does not work with <= 1.36
+            limit = 0 if _version(**kwargs) > (1, 36) else 0x7fff
+            distance = 0
+            tag_re = re.compile(kwargs[_TAG]) if _TAG in kwargs else None
+            for l in run('timeline', 'parents', 'current', '-n', str(limit), '-t', 'ci', '-W', '0', cwd=root)[0].splitlines():
+                m = _timeline_re.match(l)
+                if not m:
+                    continue
+                elif (m.group('tags')
+                      and len(m.group('tags').split(',')) > 1):
+                    check_in = m.group('check_in')
+                    if check_in not in known:
+                        known[check_in] = run('tag', 'list', check_in, cwd=root)[0].splitlines()
+                    tags = [tag for tag in known[check_in]
+                            if (tag != branch
+                                and not tag.startswith('branch=')
+                                and (not tag_re
+                                     or tag_re.match(tag)))]
+                    if tags:
+                        tag = cast(str, core.select_tag(tags, kwargs.get(_SELECT, 'scm-default')))
                         return core.SCMInfo(tag, distance, revision, dirty, branch)
-            distance += 1
+                distance += 1
+        finally:
+            if (index
+                and st
+                and len(known) != n):
+                index.update(st, known)
         return core.SCMInfo(distance=distance,
                             revision=revision,
                             dirty=dirty,
@@ -123,6 +140,10 @@ def _branch_of(root: Path, closed: bool = False) -> str | None:
     return None
 
 
+def _version(**kwargs: Any) -> tuple[int, ...]:
+    return cache.tool_version(util.command('fossil'), version, **kwargs)
+
+
 def version() -> tuple[int, ...]:
     m = _version_re.match(run('version')[0].strip())
     if (not m
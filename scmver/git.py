@@ -1,24 +1,29 @@
 #
 # scmver.git
 #
-#   Copyright (c) 2019-2025 Akinori Hattori <hattya@gmail.com>
+#   Copyright (c) 2019-2026 Akinori Hattori <hattya@gmail.com>
 #
 #   SPDX-License-Identifier: MIT
 #
 
 from __future__ import annotations
+from collections.abc import Sequence
+import fnmatch
+import functools
 import os
 import re
 import sys
 from typing import Any
 
-from . import core, util
+from . import cache, core, util
 from ._typing import Path
 
 
-__all__ = ['parse', 'version', 'run']
+__all__ = ['parse', 'dirty', 'version', 'run']
 
 _TAG = 'git.tag'
+_EXCLUDE = 'git.exclude'
+_SELECT = 'tag_select'
 # environ
 _env: tuple[str, ...] = ('GIT_CONFIG_NOSYSTEM', 'GIT_CONFIG_SYSTEM', 'GIT_CONFIG_GLOBAL', 'HOME', 'XDG_CONFIG_HOME')
 
@@ -45,28 +50,70 @@ _version_re = re.compile(r"""
 
 def parse(root: Path, name: str | None = '.git', **kwargs: Any) -> core.SCMInfo | None:
     if name == '.git':
-        args = ['describe', '--dirty=+', '--tags', '--abbrev=40', '--long', '--always']
-        if _TAG in kwargs:
-            args += ('--match', kwargs[_TAG])
+        match = _globs(kwargs.get(_TAG))
+        exclude = _globs(kwargs.get(_EXCLUDE))
+        args = ['describe', '--tags', '--abbrev=40', '--long', '--always']
+        for pat in match:
+            args += ('--match', pat)
+        for pat in exclude:
+            args += ('--exclude', pat)
         out = run(*args, cwd=root)[0].strip().rsplit('-', 2)
-
-        branch: str | None = run('rev-parse', '--abbrev-ref', 'HEAD', cwd=root)[0].strip()
-        if branch == 'HEAD':
-            branch = run('symbolic-ref', '--short', 'HEAD', cwd=root)[0].strip() or None
+        # the branch is resolved when it is used
+        branch = functools.partial(_branch_of, root)
 
         if len(out) == 3:
-            return core.SCMInfo(out[0], int(out[1]), out[2][1:].rstrip('+'), out[2].endswith('+'), branch)
+            tag = out[0]
+            if (select := kwargs.get(_SELECT, 'scm-default')) != 'scm-default':
+                args = ['tag', '--list', '--points-at', f'{tag}^{{commit}}', '--sort=-creatordate']
+                tags = [t for t in run(*args, *match, cwd=root)[0].splitlines()
+                        if not any(fnmatch.fnmatchcase(t, pat) for pat in exclude)]
+                tag = core.select_tag(tags, select) or tag
+            return core.LazySCMInfo(tag, int(out[1]), out[2][1:], _dirty(root), branch=branch)
         elif out[0]:
-            return core.SCMInfo(distance=len(run('rev-list', 'HEAD', '--', cwd=root)[0].splitlines()),
-                                revision=out[0].rstrip('+'),
-                                dirty=out[0].endswith('+'),
-                                branch=branch)
-        elif branch:
-            return core.SCMInfo(dirty=any(l for l in run('status', '--porcelain', cwd=root)[0].splitlines() if l[0] != '?'),
-                                branch=branch)
+            if _version(**kwargs) >= (1, 7, 2):
+                distance = int(run('rev-list', '--count', 'HEAD', '--', cwd=root)[0])
+            else:
+                distance = len(run('rev-list', 'HEAD', '--', cwd=root)[0].splitlines())
+            return core.LazySCMInfo(distance=distance,
+                                    revision=out[0],
+                                    dirty=_dirty(root),
+                                    branch=branch)
+        elif b := branch():
+            return core.SCMInfo(dirty=_dirty(root),
+                                branch=b)
     return None
 
 
+def dirty(root: Path, name: str | None = '.git', **kwargs: Any) -> bool | None:
+    if name == '.git':
+        return _dirty(root)
+    return None
+
+
+def _dirty(root: Path) -> bool:
+    # "describe --dirty" refreshes the index regardless of GIT_OPTIONAL_LOCKS
+    return bool(run('status', '--porcelain', '--untracked-files=no', cwd=root)[0].strip())
+
+
+def _branch_of(root: Path) -> str | None:
+    branch = run('rev-parse', '--abbrev-ref', 'HEAD', cwd=root)[0].strip()
+    if branch == 'HEAD':
+        return run('symbolic-ref', '--short', 'HEAD', cwd=root)[0].strip() or None
+    return branch
+
+
+def _globs(pats: str | Sequence[str] | None) -> tuple[str, ...]:
+    if not pats:
+        return ()
+    elif isinstance(pats, str):
+        return (pats,)
+    return tuple(pats)
+
+
+def _version(**kwargs: Any) -> tuple[int | str, ...]:
+    return cache.tool_version(util.command('git'), version, **kwargs)
+
+
 def version() -> tuple[int | str, ...]:
     m = _version_re.match(run('--version')[0].strip())
     if not m:
@@ -86,6 +133,8 @@ def version() -> tuple[int | str, ...]:
 
 def run(*args: str, **kwargs: Any) -> tuple[str, str]:
     env = {k: os.environ[k] for k in _env if k in os.environ}
+    # do not write the index, which takes index.lock
+    env['GIT_OPTIONAL_LOCKS'] = '0'
     if 'env' in kwargs:
         env.update(kwargs['env'])
     kwargs['env'] = env
@@ -1,7 +1,7 @@
 #
 # scmver.mercurial
 #
-#   Copyright (c) 2019-2025 Akinori Hattori <hattya@gmail.com>
+#   Copyright (c) 2019-2026 Akinori Hattori <hattya@gmail.com>
 #
 #   SPDX-License-Identifier: MIT
 #
@@ -15,11 +15,12 @@ from . import core, util
 from ._typing import Path
 
 
-__all__ = ['parse', 'version', 'run']
+__all__ = ['parse', 'dirty', 'version', 'run']
 
 _TAG = 'mercurial.tag'
+_SELECT = 'tag_select'
 # environ
-_env = {'HGRCPATH': ''}
+_env = {'HGPLAIN': '1', 'HGRCPATH': ''}
 
 _version_re = re.compile(r"""
     \A
@@ -56,7 +57,8 @@ def parse(root: Path, name: str | None = '.hg', **kwargs: Any) -> core.SCMInfo |
             tmpl = "{node}\t{latesttag(" + pat + ") % '{tag}\t{changes}\t'}"
             out = run('log', '-r', '.', '-T', tmpl, cwd=root, env=env, encoding='utf-8')[0].split('\t')
             if len(out) >= 3:
-                return core.SCMInfo(_tag_of(out[1]), int(out[2]), out[0], dirty, branch)
+                tag = _select(root, out[1:len(out) - 1:2], **kwargs) or out[1]
+                return core.SCMInfo(_tag_of(tag), int(out[2]), out[0], dirty, branch)
     elif name == '.hg_archival.txt':
         p = os.path.join(root, name)
         try:
@@ -75,18 +77,44 @@ def parse(root: Path, name: str | None = '.hg', **kwargs: Any) -> core.SCMInfo |
         else:
             if _TAG in kwargs:
                 tag_re = re.compile(kwargs[_TAG])
-                for tag in meta['tag']:
-                    if (tag != 'null'
-                        and tag_re.match(tag)):
-                        break
-                else:
+                tags = [tag for tag in meta['tag'] if tag != 'null' and tag_re.match(tag)]
+                if not tags:
                     raise ValueError('no such tag')
             else:
-                tag = meta['tag'][0]
+                tags = cast(list[str], meta['tag'])
+            tag = _select(root, tags, **kwargs) or tags[0]
             return core.SCMInfo(_tag_of(tag), int(cast(str, meta.get('changessincelatesttag', 0))), cast(str, meta['node']), False, cast(str, meta['branch']))
     return None
 
 
+def dirty(root: Path, name: str | None = '.hg', **kwargs: Any) -> bool | None:
+    if name == '.hg':
+        out = run('identify', '-i', cwd=root, env={'HGENCODING': 'utf-8'}, encoding='utf-8')[0].strip()
+        if out:
+            return out.endswith('+')
+    return None
+
+
+def _select(root: Path, tags: list[str], **kwargs: Any) -> str | None:
+    select = kwargs.get(_SELECT, 'scm-default')
+    if (select == 'scm-default'
+        or len(tags) < 2):
+        return None
+    elif select == 'newest':
+        # tags are appended to .hgtags
+        order: dict[str, int] = {}
+        try:
+            with open(os.path.join(root, '.hgtags'), encoding='utf-8') as fp:
+                for i, l in enumerate(fp):
+                    v = l.strip().split(' ', 1)
+                    if len(v) == 2:
+                        order[v[1]] = i
+        except OSError:
+            pass
+        tags = sorted(tags, key=lambda t: order.get(t, -1), reverse=True)
+    return core.select_tag(tags, select)
+
+
 def _tag_of(tag: str) -> str:
     return tag if tag != 'null' else '0.0'
 
@@ -109,8 +137,8 @@ def version() -> tuple[int | str, ...]:
 
 
 def run(*args: str, **kwargs: Any) -> tuple[str, str]:
-    env = _env
+    env = _env.copy()
     if 'env' in kwargs:
-        env |= kwargs['env']
+        env.update(kwargs['env'])
     kwargs['env'] = env
     return util.exec_((util.command('hg'),) + args, **kwargs)
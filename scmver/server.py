@@ -0,0 +1,139 @@
+#
+# scmver.server
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+from __future__ import annotations
+from collections import OrderedDict
+import json
+import os
+import socket
+import socketserver
+import stat as stat_
+import threading
+from typing import Any
+
+from . import cache, core
+from ._typing import Path
+
+
+__all__ = ['Server', 'request', 'serve']
+
+_ERRORS: dict[str, type[Exception]] = {
+    'OSError': OSError,
+    'TimeoutError': TimeoutError,
+    'ValueError': ValueError,
+}
+# maximum number of cached entries
+_MAXSIZE = 128
+
+
+def serve(path: Path) -> None:
+    with Server(path) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def request(path: Path, root: Path, **kwargs: Any) -> core.SCMInfo | None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(os.fspath(path))
+        with sock.makefile('rwb') as fp:
+            fp.write(json.dumps({'root': os.path.abspath(root), 'kwargs': kwargs}).encode('utf-8') + b'\n')
+            fp.flush()
+            resp = json.loads(fp.readline())
+    if 'error' in resp:
+        raise _ERRORS.get(resp['error'][0], OSError)(resp['error'][1])
+    return core.SCMInfo(*resp['info']) if resp['info'] is not None else None
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, path: Path) -> None:
+        self.path = os.fspath(path)
+        self._bound = False
+        self._infos: OrderedDict[str, tuple[list[Any], core.SCMInfo | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        # remove a stale socket, but not the one of a running server
+        try:
+            if stat_.S_ISSOCK(os.lstat(self.path).st_mode):
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    try:
+                        sock.connect(self.path)
+                    except ConnectionRefusedError:
+                        os.unlink(self.path)
+        except OSError:
+            pass
+        super().__init__(self.path, _Handler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        self._bound = True
+        # the server runs SCM commands for its clients
+        os.chmod(self.path, 0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self._bound:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def stat(self, root: str, **kwargs: Any) -> core.SCMInfo | None:
+        if ((fp := cache.fingerprint(root, **kwargs)) is None
+            or (dirty := core._dirty_of(fp, **kwargs)) is None):
+            return core.stat(root, **kwargs)
+
+        key = json.dumps([root, kwargs], sort_keys=True)
+        with self._lock:
+            if (c := self._infos.get(key)) is not None:
+                self._infos.move_to_end(key)
+        if (c is not None
+            and c[0] == fp):
+            if c[1] is None:
+                return None
+            # the fingerprint does not cover the working tree
+            elif (d := dirty()) is not None:
+                return c[1]._replace(dirty=d)
+
+        info = core.stat(root, **kwargs)
+        if isinstance(info, core.LazySCMInfo):
+            info = info.resolve()
+        with self._lock:
+            self._infos[key] = (fp, info)
+            self._infos.move_to_end(key)
+            while len(self._infos) > _MAXSIZE:
+                self._infos.popitem(last=False)
+        return info
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    server: Server
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            resp: dict[str, Any]
+            try:
+                req = json.loads(line)
+                info = self.server.stat(req['root'], **req.get('kwargs', {}))
+                resp = {'info': list(info) if info is not None else None}
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                resp = {'error': [_kind(e), str(e)]}
+            self.wfile.write(json.dumps(resp).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+def _kind(e: Exception) -> str:
+    if isinstance(e, TimeoutError):
+        return 'TimeoutError'
+    elif isinstance(e, OSError):
+        return 'OSError'
+    return 'ValueError'
@@ -1,30 +1,45 @@
 #
 # scmver.setuptools
 #
-#   Copyright (c) 2019-2025 Akinori Hattori <hattya@gmail.com>
+#   Copyright (c) 2019-2026 Akinori Hattori <hattya@gmail.com>
 #
 #   SPDX-License-Identifier: MIT
 #
 
 from __future__ import annotations
-import configparser
-from typing import Any
+import os
+from typing import TYPE_CHECKING, Any
 
-import setuptools
+if TYPE_CHECKING:
+    import setuptools
 
-from . import core
-from ._typing import Path
+    from ._typing import Path
 
 
 __all__ = ['finalize_version', 'scmver', 'load_cfg']
 
+_cfgs: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
 
 def finalize_version(dist: setuptools.Distribution) -> None:
+    # this hook is called for every project, so nothing should be imported
+    # unless pyproject.toml mentions scmver
+    try:
+        with open('pyproject.toml', 'rb') as fp:
+            if b'scmver' not in fp.read():
+                return
+    except OSError:
+        return
+
+    from . import core
+
     if (scmver := core.load_project()) is not None:
         dist.metadata.version = core.get_version(**scmver)
 
 
 def scmver(dist: setuptools.Distribution, key: str, value: Any) -> None:
+    from . import core
+
     if not value:
         return
     elif value is True:
@@ -36,11 +51,31 @@ def scmver(dist: setuptools.Distribution, key: str, value: Any) -> None:
 
 
 def load_cfg(path: Path = 'setup.cfg') -> dict[str, Any] | None:
+    if not os.path.isfile(path):
+        return None
+
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    if (c := _cfgs.get(path)) is None or c[0] != key:
+        c = _cfgs[path] = (key, _load_cfg(path))
+    return dict(c[1])
+
+
+def _load_cfg(path: str) -> dict[str, Any]:
+    import configparser
+    import locale
+
     scmver: dict[str, Any] = {}
+    with open(path, 'rb') as fp:
+        data = fp.read()
+    # skip parsing when it cannot have the scmver section
+    if b'scmver' not in data:
+        return scmver
+
     try:
         cp = configparser.ConfigParser()
-        if not cp.read(path):
-            return None
+        cp.read_string(data.decode(locale.getpreferredencoding(False)), path)
 
         for k, v in cp.items('scmver'):
             if k == 'fallback':
@@ -7,20 +7,22 @@
 #
 
 from __future__ import annotations
-from collections.abc import Mapping
+from collections.abc import Generator, Iterator, Mapping
+import contextlib
 import os
 import re
 from typing import cast, Any
 import urllib.parse
 import xml.etree.ElementTree as ET
 
-from . import core, util
+from . import cache, core, util
 from ._typing import Path
 
 
-__all__ = ['parse', 'version', 'run']
+__all__ = ['parse', 'dirty', 'version', 'run']
 
 _TAG = 'subversion.tag'
+_SELECT = 'tag_select'
 # layout
 _TRUNK = 'subversion.trunk'
 _BRANCHES = 'subversion.branches'
@@ -73,35 +75,18 @@ def parse(root: Path, name: str | None = '.svn', **kwargs: Any) -> core.SCMInfo
         revision = int(info.get('Revision', 0))
         branch = _branch_of(info, **kwargs)
 
-        out = cast(ET.Element, run('status', '--xml', cwd=root)[0])
-        for e in out.iterfind('.//wc-status'):
-            if (e.get('item') in _MODIFIED
-                or e.get('props') in _MODIFIED):
-                dirty = True
-                break
-        else:
-            dirty = False
+        dirty = _status(root)
 
         tags = _rel(_TAGS, 'tags', **kwargs)
-        url = info['Repository Root'] + tags
-        r = revision
         tag_re = re.compile(kwargs[_TAG]) if _TAG in kwargs else None
-        while r > 0:
-            try:
-                out = cast(ET.Element, run('log', '-r', f'{r}:0', '-v', '--xml', '-l', '10', url, cwd=root)[0])
-            except SyntaxError:
-                break
-            for e in out.iterfind('./logentry'):
-                r = int(cast(str, e.get('revision')))
-                for p in e.iterfind('.//path[@kind="dir"]'):
-                    p.text = cast(str, p.text)
-                    if not p.text.startswith(tags):
-                        continue
-                    tag = p.text[len(tags):].split('/', 1)[0]
-                    if (not tag_re
-                        or tag_re.match(tag)):
-                        return core.SCMInfo(tag, _distance_of(root, info, r), revision, dirty, branch)
-            r -= 1
+        with contextlib.closing(_tags_of(root, info, tags, revision, **kwargs)) as it:
+            for r, cands in it:
+                cands = [tag for tag in cands
+                         if (not tag_re
+                             or tag_re.match(tag))]
+                if cands:
+                    tag = cast(str, core.select_tag(cands, kwargs.get(_SELECT, 'scm-default')))
+                    return core.SCMInfo(tag, _distance_of(root, info, r), revision, dirty, branch)
         return core.SCMInfo(distance=_distance_of(root, info, 0),
                             revision=revision,
                             dirty=dirty,
@@ -109,6 +94,22 @@ def parse(root: Path, name: str | None = '.svn', **kwargs: Any) -> core.SCMInfo
     return None
 
 
+def dirty(root: Path, name: str | None = '.svn', **kwargs: Any) -> bool | None:
+    if (name == '.svn'
+        and _is_wc_root(root, _info(root))):
+        return _status(root)
+    return None
+
+
+def _status(root: Path) -> bool:
+    out = cast(ET.Element, run('status', '--xml', cwd=root)[0])
+    for e in out.iterfind('.//wc-status'):
+        if (e.get('item') in _MODIFIED
+            or e.get('props') in _MODIFIED):
+            return True
+    return False
+
+
 def _info(root: Path) -> dict[str, str]:
     out = cast(str, run('info', cwd=root)[0]).strip().splitlines()
     return dict(cast(tuple[str, str], (s.strip() for s in l.split(':', 1))) for l in out)
@@ -126,10 +127,83 @@ def _is_wc_root(root: Path, info: Mapping[str, str]) -> bool:
     return False
 
 
+def _tags_of(root: Path, info: Mapping[str, str], tags: str, revision: int, **kwargs: Any) -> Generator[tuple[int, list[str]], None, None]:
+    # the log of the tags directory is immutable, the index keeps the revisions
+    # which have been scanned contiguously
+    index = cache.TagIndex.open('subversion', info['Repository UUID'] + tags, **kwargs)
+    known = (index.get([1]) if index else None) or {}
+    low, high = (index.data.get('low', 1), index.data.get('high', 0)) if index and known else (1, 0)
+
+    def scanned(lo: int, hi: int) -> None:
+        nonlocal low, high
+        if (lo > high + 1
+            or hi < low - 1):
+            if hi > high:
+                low, high = lo, hi
+        else:
+            low, high = min(low, lo), max(high, hi)
+
+    url = info['Repository Root'] + tags
+    r = revision
+    try:
+        if (known
+            and r > high):
+            # revisions above the index are scanned at once to extend it
+            try:
+                out = cast(ET.Element, run('log', '-r', f'{r}:{high + 1}', '-v', '--xml', url, cwd=root)[0])
+            except SyntaxError:
+                out = None
+            if out is not None:
+                entries = list(_entries_of(out, tags))
+                known.update((str(i), cands) for i, cands in entries)
+                old = high
+                scanned(high + 1, r)
+                yield from entries
+                r = old
+
+        while r > 0:
+            if low <= r <= high:
+                for i in sorted((i for k in known if low <= (i := int(k)) <= r), reverse=True):
+                    yield i, known[str(i)]
+                r = low - 1
+                continue
+
+            try:
+                out = cast(ET.Element, run('log', '-r', f'{r}:0', '-v', '--xml', '-l', '10', url, cwd=root)[0])
+            except SyntaxError:
+                break
+            top = r
+            n = 0
+            for r, cands in _entries_of(out, tags):
+                n += 1
+                known[str(r)] = cands
+                scanned(r, top)
+                yield r, cands
+            if n < 10:
+                scanned(0, top)
+                break
+            r -= 1
+    finally:
+        if index:
+            index.update([1], known, low=low, high=high)
+
+
+def _entries_of(out: ET.Element, tags: str) -> Iterator[tuple[int, list[str]]]:
+    for e in out.iterfind('./logentry'):
+        cands: list[str] = []
+        for p in e.iterfind('.//path[@kind="dir"]'):
+            p.text = cast(str, p.text)
+            if p.text.startswith(tags):
+                tag = p.text[len(tags):].split('/', 1)[0]
+                if tag not in cands:
+                    cands.append(tag)
+        yield int(cast(str, e.get('revision'))), cands
+
+
 def _distance_of(root: Path, info: Mapping[str, str], rev: int | str) -> int:
     rev = str(rev)
     i = 0
-    out = cast(ET.Element, run('log', '-r', f'{info.get("Revision", "BASE")}:{rev}', '--xml', cwd=root)[0])
+    out = cast(ET.Element, run('log', '-q', '-r', f'{info.get("Revision", "BASE")}:{rev}', '--xml', cwd=root)[0])
     for e in out.iterfind('./logentry'):
         if e.get('revision') != rev:
             i += 1
@@ -7,20 +7,31 @@
 #
 
 from __future__ import annotations
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+import contextlib
+import contextvars
 import locale
 import os
 import subprocess
 import sys
+import threading
+import time
+from typing import Any, NamedTuple, TextIO, TypeAlias
 
 from ._typing import Path
 
 
-__all__ = ['exec_', 'command', 'which']
+__all__ = ['exec_', 'limit', 'span', 'trace', 'dump_trace', 'record', 'replay', 'command', 'which', 'parents', 'Event']
+
+_Listener: TypeAlias = Callable[['Event'], None]
+
+_limit: contextvars.ContextVar[tuple[float | None, float | None]] = contextvars.ContextVar('limit', default=(None, None))
+_trace: contextvars.ContextVar[tuple[_Listener, ...]] = contextvars.ContextVar('trace', default=())
+_cassette: contextvars.ContextVar[_Cassette | None] = contextvars.ContextVar('cassette', default=None)
 
 
 def exec_(args: Sequence[Path], cwd: Path | None = None, env: Mapping[str, str] | None = None,
-          encoding: str | None = None, errors: str = 'strict') -> tuple[str, str]:
+          encoding: str | None = None, errors: str = 'strict', timeout: float | None = None) -> tuple[str, str]:
     env = dict(env) if env else {}
     env['LC_MESSAGES'] = 'C'
     for k in ('LC_ALL', 'LANG', 'PATH', 'LD_LIBRARY_PATH', 'SystemRoot'):
@@ -28,16 +39,191 @@ def exec_(args: Sequence[Path], cwd: Path | None = None, env: Mapping[str, str]
             env[k] = os.environ[k]
     if encoding is None:
         encoding = locale.getpreferredencoding(False)
+    default, deadline = _limit.get()
+    if timeout is None:
+        timeout = default
+    if deadline is not None:
+        rest = deadline - time.monotonic()
+        if rest <= 0:
+            raise TimeoutError(f'deadline exceeded: {os.fspath(args[0])}')
+        timeout = min(timeout, rest) if timeout is not None else rest
+
+    cassette = _cassette.get()
+    listeners = _trace.get()
+    start = time.monotonic()
+    if (cassette is not None
+        and cassette.replay):
+        stdout, stderr, returncode = cassette.play(args)
+    else:
+        try:
+            proc = subprocess.run(args,
+                                  capture_output=True,
+                                  cwd=cwd,
+                                  env=env,
+                                  timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            if listeners:
+                _emit(listeners, 'exec', start, argv=[os.fspath(a) for a in args], cwd=os.fspath(cwd) if cwd else None,
+                      returncode=None, stdout=len(e.stdout or b''), stderr=len(e.stderr or b''))
+            raise TimeoutError(f'command timed out after {timeout:g} seconds: {os.fspath(args[0])}') from None
+        stdout, stderr, returncode = proc.stdout, proc.stderr, proc.returncode
+        if cassette is not None:
+            cassette.add(args, cwd, stdout, stderr, returncode)
+    if listeners:
+        _emit(listeners, 'exec', start, argv=[os.fspath(a) for a in args], cwd=os.fspath(cwd) if cwd else None,
+              returncode=returncode, stdout=len(stdout), stderr=len(stderr))
+    return stdout.decode(encoding, errors), stderr.decode(encoding, errors)
+
+
+@contextlib.contextmanager
+def limit(timeout: float | None = None, deadline: float | None = None) -> Iterator[None]:
+    default, end = _limit.get()
+    if timeout is not None:
+        default = timeout
+    if deadline is not None:
+        deadline += time.monotonic()
+        end = min(end, deadline) if end is not None else deadline
+    token = _limit.set((default, end))
+    try:
+        yield
+    finally:
+        _limit.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    if not (listeners := _trace.get()):
+        yield
+        return
+
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        _emit(listeners, name, start, **args)
+
+
+@contextlib.contextmanager
+def trace(listener: _Listener | None = None) -> Iterator[list[Event]]:
+    events: list[Event] = []
+    listeners = _trace.get() + (events.append,)
+    if listener is not None:
+        listeners += (listener,)
+    token = _trace.set(listeners)
+    try:
+        yield events
+    finally:
+        _trace.reset(token)
+
+
+def dump_trace(events: Sequence[Event], fp: TextIO) -> None:
+    import json
+
+    # Chrome trace event format
+    pid = os.getpid()
+    json.dump({
+        'traceEvents': [{
+            'name': ev.name,
+            'cat': 'scmver',
+            'ph': 'X',
+            'ts': ev.start * 1e6,
+            'dur': (ev.end - ev.start) * 1e6,
+            'pid': pid,
+            'tid': ev.thread,
+            'args': ev.args,
+        } for ev in events],
+        'displayTimeUnit': 'ms',
+    }, fp, indent=1)
+
+
+def _emit(listeners: Sequence[_Listener], name: str, start: float, **args: Any) -> None:
+    ev = Event(name, start, time.monotonic(), threading.get_ident(), args)
+    for l in listeners:
+        l(ev)
+
+
+class Event(NamedTuple):
 
-    proc = subprocess.run(args,
-                          capture_output=True,
-                          cwd=cwd,
-                          env=env)
-    return proc.stdout.decode(encoding, errors), proc.stderr.decode(encoding, errors)
+    name: str
+    start: float
+    end: float
+    thread: int
+    args: dict[str, Any]
+
+
+@contextlib.contextmanager
+def record(path: Path, **meta: Any) -> Iterator[None]:
+    import json
+
+    cassette = _Cassette()
+    token = _cassette.set(cassette)
+    try:
+        yield
+    finally:
+        _cassette.reset(token)
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump({'meta': meta, 'calls': cassette.calls}, fp, indent=1)
+
+
+@contextlib.contextmanager
+def replay(path: Path) -> Iterator[dict[str, Any]]:
+    import json
+
+    with open(path, encoding='utf-8') as fp:
+        o = json.load(fp)
+    token = _cassette.set(_Cassette(o['calls']))
+    try:
+        yield o.get('meta', {})
+    finally:
+        _cassette.reset(token)
+
+
+class _Cassette:
+
+    def __init__(self, calls: list[dict[str, Any]] | None = None) -> None:
+        self.replay = calls is not None
+        self.calls = calls if calls is not None else []
+        self._calls: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        self._pos: dict[tuple[str, ...], int] = {}
+        for c in self.calls:
+            self._calls.setdefault(self._key(c['argv']), []).append(c)
+
+    def add(self, args: Sequence[Path], cwd: Path | None, stdout: bytes, stderr: bytes, returncode: int) -> None:
+        self.calls.append({
+            'argv': [os.fspath(a) for a in args],
+            'cwd': os.fspath(cwd) if cwd else None,
+            'stdout': stdout.decode('utf-8', 'surrogateescape'),
+            'stderr': stderr.decode('utf-8', 'surrogateescape'),
+            'returncode': returncode,
+        })
+
+    def play(self, args: Sequence[Path]) -> tuple[bytes, bytes, int]:
+        key = self._key(args)
+        if not (calls := self._calls.get(key)):
+            raise LookupError(f'no recording for: {" ".join(key)}')
+        # recordings of the same command are replayed in order, and repeatedly
+        i = self._pos.get(key, 0)
+        self._pos[key] = i + 1
+        c = calls[i % len(calls)]
+        return c['stdout'].encode('utf-8', 'surrogateescape'), c['stderr'].encode('utf-8', 'surrogateescape'), c['returncode']
+
+    def command(self, *names: str) -> str:
+        # the command may have been recorded under an alternative name
+        recorded = {k[0] for k in self._calls}
+        return next((n for n in names if n in recorded), names[0])
+
+    @staticmethod
+    def _key(args: Sequence[Path]) -> tuple[str, ...]:
+        # the path of the command depends on the machine
+        name = os.path.splitext(os.path.basename(os.fspath(args[0])))[0]
+        return (name, *(os.fspath(a) for a in args[1:]))
 
 
 def command(name: str, *args: str) -> str:
-    if (path := which(name)) is not None:
+    if ((cassette := _cassette.get()) is not None
+        and cassette.replay):
+        return cassette.command(name, *args)
+    elif (path := which(name)) is not None:
         return path
     for a in args:
         if (path := which(a)) is not None:
@@ -55,3 +241,29 @@ def which(name: str) -> str | None:
             if os.path.isfile(name := os.path.join(p, n)):
                 return name
     return None
+
+
+def parents(path: Path, ceiling_dirs: str | Iterable[str] | None = None, one_filesystem: bool = False) -> Iterator[str]:
+    ceilings = set()
+    for v in (ceiling_dirs, os.environ.get('SCMVER_CEILING_DIRECTORIES')):
+        for p in v.split(os.pathsep) if isinstance(v, str) else v or ():
+            # relative paths are ignored as GIT_CEILING_DIRECTORIES
+            if os.path.isabs(p):
+                ceilings.add(os.path.normcase(os.path.normpath(p)))
+
+    path = os.path.abspath(path)
+    dev = None
+    while True:
+        yield path
+        p, path = path, os.path.dirname(path)
+        if (path == p
+            or os.path.normcase(path) in ceilings):
+            return
+        elif one_filesystem:
+            try:
+                if dev is None:
+                    dev = os.stat(p).st_dev
+                if os.stat(path).st_dev != dev:
+                    return
+            except OSError:
+                return
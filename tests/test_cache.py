@@ -0,0 +1,237 @@
+#
+# test_cache
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+import concurrent.futures
+import os
+from pathlib import Path
+import threading
+import time
+import unittest.mock
+
+from scmver import cache
+from base import SCMVerTestCase
+
+
+class CacheTestCase(SCMVerTestCase):
+
+    @unittest.mock.patch.dict('os.environ')
+    def test_cache_dir(self):
+        os.environ.pop('SCMVER_CACHE_DIR', None)
+        self.assertIsNone(cache.cache_dir())
+        self.assertEqual(cache.cache_dir(cache_dir='spam'), 'spam')
+
+        os.environ['SCMVER_CACHE_DIR'] = 'eggs'
+        self.assertEqual(cache.cache_dir(), 'eggs')
+        self.assertEqual(cache.cache_dir(cache_dir='spam'), 'spam')
+
+    @unittest.mock.patch.dict(cache._memo, clear=True)
+    def test_memoize(self):
+        func = unittest.mock.Mock(side_effect=lambda: func.call_count)
+        with unittest.mock.patch('time.monotonic', return_value=0.0) as monotonic:
+            self.assertEqual(cache.memoize('a', 10, func), 1)
+            self.assertEqual(cache.memoize('a', 10, func), 1)
+            self.assertEqual(cache.memoize('b', 10, func), 2)
+            # expired
+            monotonic.return_value = 10.0
+            self.assertEqual(cache.memoize('a', 10, func), 3)
+            self.assertEqual(func.call_count, 3)
+
+            # least recently used
+            with unittest.mock.patch.object(cache, '_MAXSIZE', 2):
+                self.assertEqual(cache.memoize('b', 10, func), 4)
+                self.assertEqual(cache.memoize('a', 10, func), 3)
+                self.assertEqual(cache.memoize('c', 10, func), 5)
+                self.assertEqual(list(cache._memo), ['a', 'c'])
+
+        # errors are not memoized
+        with self.assertRaises(ValueError):
+            cache.memoize('d', 10, unittest.mock.Mock(side_effect=ValueError))
+        self.assertEqual(cache.memoize('d', 10, lambda: 'd'), 'd')
+
+    @unittest.mock.patch.dict(cache._memo, clear=True)
+    def test_memoize_in_flight(self):
+        barrier = threading.Barrier(8)
+        func = unittest.mock.Mock(side_effect=lambda: time.sleep(0.2) or object())
+
+        def memoize():
+            barrier.wait()
+            return cache.memoize('key', 0, func)
+
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            rv = list(pool.map(lambda _: memoize(), range(8)))
+        self.assertEqual(len(set(map(id, rv))), 1)
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(cache._flights, {})
+
+    def test_stamp(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            spam = path / 'spam'
+            self.assertIsNone(cache.stamp(spam))
+
+            with spam.open('w') as fp:
+                fp.write('spam')
+            st = cache.stamp(spam)
+            self.assertEqual(st, [spam.stat().st_mtime_ns, 4])
+            self.assertEqual(cache.stamp(spam, spam), st * 2)
+            self.assertIsNone(cache.stamp(spam, path / 'eggs'))
+
+    @unittest.mock.patch.dict('os.environ')
+    def test_tag_index(self):
+        os.environ.pop('SCMVER_CACHE_DIR', None)
+        self.assertIsNone(cache.TagIndex.open('git', '.'))
+
+        with self.tempdir() as path:
+            path = Path(path) / 'cache'
+            index = cache.TagIndex.open('git', 'spam', cache_dir=str(path))
+            self.assertIsNone(index.get([1]))
+
+            index.update([1], {'1': ['v1.0']}, low=1)
+            self.assertEqual(len(list(path.iterdir())), 1)
+
+            index = cache.TagIndex.open('git', 'spam', cache_dir=str(path))
+            self.assertEqual(index.get([1]), {'1': ['v1.0']})
+            self.assertEqual(index.data, {'low': 1})
+            self.assertIsNone(index.get([2]))
+
+            self.assertIsNone(cache.TagIndex.open('git', 'eggs', cache_dir=str(path)).get([1]))
+            self.assertIsNone(cache.TagIndex.open('hg', 'spam', cache_dir=str(path)).get([1]))
+
+            with open(index.path, 'w') as fp:
+                fp.write('{')
+            self.assertIsNone(cache.TagIndex.open('git', 'spam', cache_dir=str(path)).get([1]))
+
+    def test_fingerprint(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            root = path / 'spam'
+            root.mkdir()
+            fp = cache.fingerprint(str(root))
+            if fp is not None:
+                self.assertNotEqual(fp[0], str(root))
+
+            (path / '.git').mkdir()
+            fp = cache.fingerprint(str(root))
+            self.assertEqual(fp[:2], [str(path), '.git'])
+            self.assertEqual(cache.fingerprint(str(root)), fp)
+
+            with (path / '.git' / 'HEAD').open('w') as f:
+                f.write('ref: refs/heads/master\n')
+            self.assertNotEqual(cache.fingerprint(str(root)), fp)
+
+            fp = cache.fingerprint(str(root))
+            (path / '.git' / 'refs' / 'tags' / 'v1').mkdir(parents=True)
+            fp, prev = cache.fingerprint(str(root)), fp
+            self.assertNotEqual(fp, prev)
+            self.touch(path / '.git' / 'refs' / 'tags' / 'v1' / '0')
+            self.assertNotEqual(cache.fingerprint(str(root)), fp)
+
+            (root / '.hg').mkdir()
+            self.assertEqual(cache.fingerprint(str(root))[:2], [str(root), '.hg'])
+
+    def test_fingerprint_gitdir(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            common = path / 'repo.git'
+            gitdir = common / 'worktrees' / 'wt'
+            (common / 'refs' / 'tags').mkdir(parents=True)
+            gitdir.mkdir(parents=True)
+            root = path / 'wt'
+            root.mkdir()
+            with (root / '.git').open('w') as f:
+                f.write(f'gitdir: {gitdir}\n')
+            fp = cache.fingerprint(str(root))
+            self.assertEqual(fp[:2], [str(root), '.git'])
+
+            self.touch(gitdir / 'HEAD')
+            fp, prev = cache.fingerprint(str(root)), fp
+            self.assertNotEqual(fp, prev)
+            # refs are shared with the main worktree
+            with (gitdir / 'commondir').open('w') as f:
+                f.write('../..\n')
+            fp, prev = cache.fingerprint(str(root)), fp
+            self.assertNotEqual(fp, prev)
+            self.touch(common / 'refs' / 'tags' / 'v1.0')
+            self.assertNotEqual(cache.fingerprint(str(root)), fp)
+
+            with (root / '.git').open('w') as f:
+                f.write('spam\n')
+            self.assertIsNone(cache.fingerprint(str(root)))
+
+    def test_info(self):
+        with self.tempdir() as path:
+            key = cache.info_key(path, cache_dir=path)
+            self.assertNotEqual(cache.info_key(path, cache_dir=path, tag_select='newest'), key)
+            self.assertEqual(cache.load_info(key, [1], cache_dir=path), (False, None))
+
+            cache.save_info(key, [1], ('v1.0', 0, None, False, 'master'), cache_dir=path)
+            self.assertEqual(cache.load_info(key, [1], cache_dir=path), (True, ['v1.0', 0, None, False, 'master']))
+            self.assertEqual(cache.load_info(key, [2], cache_dir=path), (False, None))
+            # another process
+            with unittest.mock.patch.dict(cache._infos, clear=True):
+                self.assertEqual(cache.load_info(key, [1], cache_dir=path), (True, ['v1.0', 0, None, False, 'master']))
+
+            cache.save_info(key, [2], None, cache_dir=path)
+            with unittest.mock.patch.dict(cache._infos, clear=True):
+                self.assertEqual(cache.load_info(key, [2], cache_dir=path), (True, None))
+            self.assertNotEqual(cache.info_key(path + 'spam', cache_dir=path), key)
+
+    def test_tool_version(self):
+        with self.tempdir() as path:
+            exe = os.path.join(path, 'scm')
+            self.touch(exe)
+            version = unittest.mock.Mock(return_value=(1, 0, 'rc', 1))
+
+            with unittest.mock.patch.dict(cache._tools, clear=True):
+                self.assertEqual(cache.tool_version(exe, version, cache_dir=path), (1, 0, 'rc', 1))
+                self.assertEqual(cache.tool_version(exe, version, cache_dir=path), (1, 0, 'rc', 1))
+                self.assertEqual(version.call_count, 1)
+            # another process
+            with unittest.mock.patch.dict(cache._tools, clear=True):
+                self.assertEqual(cache.tool_version(exe, version, cache_dir=path), (1, 0, 'rc', 1))
+                self.assertEqual(version.call_count, 1)
+            # updated
+            with open(exe, 'w') as fp:
+                fp.write('scm 2.0')
+            version.return_value = (2, 0)
+            self.assertEqual(cache.tool_version(exe, version, cache_dir=path), (2, 0))
+            self.assertEqual(version.call_count, 2)
+            # not found
+            self.assertEqual(cache.tool_version(os.path.join(path, 'spam'), version, cache_dir=path), (2, 0))
+            self.assertEqual(version.call_count, 3)
+
+        # in memory without a cache directory
+        with (self.tempdir() as path,
+              unittest.mock.patch.dict('os.environ', {'SCMVER_CACHE_DIR': ''}),
+              unittest.mock.patch('tempfile.tempdir', path),
+              unittest.mock.patch.dict(cache._tools, clear=True)):
+            exe = os.path.join(path, 'scm')
+            self.touch(exe)
+            version = unittest.mock.Mock(return_value=(1, 0))
+            self.assertEqual(cache.tool_version(exe, version), (1, 0))
+            self.assertEqual(cache.tool_version(exe, version), (1, 0))
+            self.assertEqual(version.call_count, 1)
+            self.assertEqual(os.listdir(path), ['scm'])
+
+    @unittest.skipUnless(cache.fcntl, 'requires fcntl')
+    def test_lock(self):
+        with self.tempdir() as path:
+            with cache.lock('key', cache_dir=path) as locked:
+                self.assertTrue(locked)
+                with unittest.mock.patch.object(cache, '_WAIT', 0.1):
+                    with cache.lock('key', cache_dir=path) as locked:
+                        self.assertFalse(locked)
+                with cache.lock('other', cache_dir=path) as locked:
+                    self.assertTrue(locked)
+                # removed as a stale entry
+                os.unlink(os.path.join(path, 'info-key.lock'))
+                with cache.lock('key', cache_dir=path, deadline=0.1) as locked:
+                    self.assertTrue(locked)
+            # released
+            with cache.lock('key', cache_dir=path, deadline=0) as locked:
+                self.assertTrue(locked)
@@ -8,7 +8,11 @@
 
 import datetime
 import io
+import json
 import os
+import socket
+import subprocess
+import sys
 import textwrap
 import unittest
 import unittest.mock
@@ -17,7 +21,7 @@ try:
     import click
     import click.testing
 
-    from scmver import __version__, cli, core
+    from scmver import __version__, cli, core, util
 except ImportError:
     click = None
 from base import SCMVerTestCase
@@ -99,6 +103,83 @@ class CLITestCase(SCMVerTestCase):
             with open(path) as fp:
                 self.assertEqual(fp.read(), "__version__ = '1.0'\n")
 
+    def test_generate_many(self, stat):
+        rev = self.revision(b'scmver.cli.generate')
+        stat.return_value = core.SCMInfo('v1.0', 0, rev, False, 'master')
+
+        with self.tempdir() as path:
+            paths = [os.path.join(path, n) for n in ('__version__.py', 'VERSION')]
+            rv = self.invoke(['generate', *paths])
+            self.assertEqual(rv.exit_code, 0)
+            for p in paths:
+                with open(p) as fp:
+                    self.assertEqual(fp.read().splitlines()[-1], "version: str = '1.0'")
+
+            rv = self.invoke(['generate', '-t', '{version}\\n', *paths])
+            self.assertEqual(rv.exit_code, 0)
+            for p in paths:
+                with open(p) as fp:
+                    self.assertEqual(fp.read(), '1.0\n')
+
+            rv = self.invoke(['generate', '-t', "__version__ = '{version}'\\n", '-t', '{version}\\n', *paths])
+            self.assertEqual(rv.exit_code, 0)
+            for p, data in zip(paths, ("__version__ = '1.0'\n", '1.0\n')):
+                with open(p) as fp:
+                    self.assertEqual(fp.read(), data)
+
+            rv = self.invoke(['generate', '-t', '{version}', '-t', '{version}', '-t', '{version}', *paths])
+            self.assertEqual(rv.exit_code, 2)
+            self.assertEqual(stat.call_count, 3)
+
+    def test_import(self, stat):
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join((os.path.dirname(os.path.dirname(cli.__file__)), *sys.path))
+        proc = subprocess.run((sys.executable, '-c', 'import sys, scmver.cli; print(*sys.modules)'),
+                              stdout=subprocess.PIPE, env=env, text=True, check=True)
+        modules = set(proc.stdout.split())
+        self.assertIn('scmver.cli', modules)
+        self.assertNotIn('setuptools', modules)
+        self.assertNotIn('scmver.core', modules)
+
+    @unittest.mock.patch('time.sleep')
+    @unittest.mock.patch('scmver.cache.fingerprint')
+    def test_generate_watch(self, fingerprint, sleep, stat):
+        rev = self.revision(b'scmver.cli.generate')
+        stat.side_effect = [
+            core.SCMInfo('v1.0', 0, rev, False, 'master'),
+            core.SCMInfo('v1.0', 1, rev, False, 'master'),
+            TimeoutError('deadline exceeded: git'),
+        ]
+        fingerprint.side_effect = ['a', 'a', 'b', 'c', 'c', 'c', 'd', 'd']
+        sleep.side_effect = [None, None, None, None, None, None, None, KeyboardInterrupt]
+
+        with self.tempdir() as path:
+            path = os.path.join(path, 'VERSION')
+            with unittest.mock.patch('scmver.core.generate', wraps=core.generate) as generate:
+                rv = self.invoke(['generate', '--watch', '--interval', '0.1', '-t', '{version}', path])
+            self.assertEqual(rv.exit_code, 0)
+            self.assertEqual(rv.output, 'Error: deadline exceeded: git\n')
+            self.assertEqual(stat.call_count, 3)
+            self.assertEqual(generate.call_count, 2)
+            sleep.assert_called_with(0.1)
+            with open(path) as fp:
+                self.assertEqual(fp.read(), '1.0.post')
+
+    @unittest.mock.patch('time.sleep')
+    @unittest.mock.patch('scmver.cache.fingerprint')
+    def test_generate_watch_error(self, fingerprint, sleep, stat):
+        stat.return_value = core.SCMInfo('v1.0')
+        fingerprint.side_effect = ['a', 'a', 'b', 'b', 'c', 'c']
+        sleep.side_effect = [None, None, None, None, None, KeyboardInterrupt]
+
+        with self.tempdir() as path:
+            path = os.path.join(path, 'VERSION')
+            with unittest.mock.patch('scmver.core.generate', side_effect=[None, OSError('permission denied'), ValueError('spam')]) as generate:
+                rv = self.invoke(['generate', '--watch', '--interval', '0.1', '-t', '{version}', path])
+            self.assertEqual(rv.exit_code, 0)
+            self.assertEqual(rv.output, 'Error: permission denied\nError: spam\n')
+            self.assertEqual(generate.call_count, 3)
+
     def test_load(self, stat):
         rv = self.invoke(['load', 'os:name'])
         self.assertEqual(rv.exit_code, 0)
@@ -188,6 +269,21 @@ class CLITestCase(SCMVerTestCase):
         self.assertEqual(rv.exit_code, 2)
         self.assertRegex(rv.output.splitlines()[-1], r'^Error: .+ Regex does not have the version group\.$')
 
+    @unittest.mock.patch('scmver.setuptools.load_cfg', return_value=None)
+    @unittest.mock.patch('scmver.core.load_project')
+    def test_stat_with_config(self, load_project, load_cfg, stat):
+        load_project.return_value = {
+            'root': os.getcwd(),
+            'cache_dir': os.path.abspath('.cache'),
+            'ceiling_dirs': [os.path.abspath('..')],
+            'one_filesystem': True,
+        }
+        stat.return_value = core.SCMInfo()
+
+        rv = self.invoke(['stat'])
+        self.assertEqual(rv.exit_code, 0)
+        stat.assert_called_once_with('.', cache_dir=os.path.abspath('.cache'), ceiling_dirs=[os.path.abspath('..')], one_filesystem=True)
+
     def test_stat_without_repository(self, stat):
         stat.return_value = None
 
@@ -195,6 +291,73 @@ class CLITestCase(SCMVerTestCase):
         self.assertEqual(rv.exit_code, 0)
         self.assertEqual(rv.output, '')
 
+    def test_stat_with_tags(self, stat):
+        stat.return_value = core.SCMInfo(branch='master')
+
+        rv = self.invoke(['stat', '--tag-select', 'newest', '--git-tag', 'v*', '--git-tag', 'spam-*', '--git-exclude', '*rc*'])
+        self.assertEqual(rv.exit_code, 0)
+        self.assertEqual(stat.call_args.kwargs, {
+            'git.tag': ('v*', 'spam-*'),
+            'git.exclude': ('*rc*',),
+            'tag_select': 'newest',
+        })
+
+        rv = self.invoke(['stat', '--tag-select', 'oldest'])
+        self.assertEqual(rv.exit_code, 2)
+
+    def test_stat_timeout(self, stat):
+        stat.side_effect = TimeoutError('deadline exceeded: git')
+
+        rv = self.invoke(['stat', '--deadline', '0.5'])
+        self.assertEqual(rv.exit_code, 1)
+        self.assertEqual(rv.output, 'Error: deadline exceeded: git\n')
+        self.assertEqual(stat.call_args.kwargs, {'deadline': 0.5})
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'requires AF_UNIX')
+    @unittest.mock.patch('scmver.server.request')
+    def test_stat_with_server(self, request, stat):
+        request.return_value = core.SCMInfo('v1.0', 0, None, False, 'master')
+        rv = self.invoke(['stat', '--server', 'scmver.sock', '--git-tag', 'v*'])
+        self.assertEqual(rv.exit_code, 0)
+        self.assertEqual(rv.output, textwrap.dedent("""\
+            Tag:      v1.0
+            Distance: 0
+            Dirty:    False
+            Branch:   master
+        """))
+        self.assertEqual(request.call_args.args, ('scmver.sock', '.'))
+        self.assertEqual(request.call_args.kwargs, {'git.tag': ('v*',)})
+        self.assertEqual(stat.call_count, 0)
+
+        request.side_effect = ConnectionRefusedError('Connection refused')
+        rv = self.invoke(['next', '--server', 'scmver.sock'])
+        self.assertEqual(rv.exit_code, 1)
+        self.assertEqual(rv.output, 'Error: Connection refused\n')
+
+    def test_stat_with_trace(self, stat):
+        stat.return_value = core.SCMInfo('v1.0', 0, None, False, 'master')
+
+        with self.tempdir() as path:
+            path = os.path.join(path, 'trace.json')
+            rv = self.invoke(['next', '--trace', path])
+            self.assertEqual(rv.exit_code, 0)
+            self.assertEqual(rv.output, '1.0\n')
+            with open(path) as fp:
+                self.assertEqual([e['name'] for e in json.load(fp)['traceEvents']], ['next_version'])
+
+        def branch():
+            with util.span('branch'):
+                return 'master'
+
+        stat.side_effect = lambda *args, **kwargs: core.LazySCMInfo('v1.0', branch=branch)
+        with self.tempdir() as path:
+            path = os.path.join(path, 'trace.json')
+            rv = self.invoke(['stat', '--trace', path])
+            self.assertEqual(rv.exit_code, 0)
+            self.assertIn('Branch:   master\n', rv.output)
+            with open(path) as fp:
+                self.assertEqual([e['name'] for e in json.load(fp)['traceEvents']], ['branch'])
+
     def test_stat_with_defaults(self, stat):
         rev = self.revision(b'scmver.cli.stat')
 
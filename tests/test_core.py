@@ -6,15 +6,25 @@
 #   SPDX-License-Identifier: MIT
 #
 
+import concurrent.futures
 import datetime
+import operator
 import os
 from pathlib import Path
+import pickle
+import random
 import sys
 import textwrap
+import time
 import unittest
 import unittest.mock
 
-from scmver import core
+try:
+    import packaging.version
+except ImportError:
+    packaging = None
+
+from scmver import cache, core, util
 from base import requires_tomli, SCMVerTestCase
 
 
@@ -66,6 +76,31 @@ class CoreTestCase(SCMVerTestCase):
                     branch = ''
                 """))
 
+    def test_generate_unchanged(self):
+        with self.tempdir() as path:
+            path = Path(path) / '__version__.py'
+            core.generate(path, '1.0')
+            if os.name != 'nt':
+                path.chmod(0o640)
+            os.utime(path, ns=(0, 0))
+            # unchanged
+            core.generate(path, '1.0')
+            self.assertEqual(path.stat().st_mtime_ns, 0)
+            # changed
+            with unittest.mock.patch('os.replace', side_effect=OSError):
+                with self.assertRaises(OSError):
+                    core.generate(path, '1.1')
+            self.assertEqual(path.stat().st_mtime_ns, 0)
+            self.assertEqual(list(path.parent.iterdir()), [path])
+
+            core.generate(path, '1.1')
+            self.assertNotEqual(path.stat().st_mtime_ns, 0)
+            if os.name != 'nt':
+                self.assertEqual(path.stat().st_mode & 0o777, 0o640)
+            with path.open() as fp:
+                self.assertIn("version: str = '1.1'", fp.read())
+            self.assertEqual(list(path.parent.iterdir()), [path])
+
     def test_load_version(self):
         self.assertEqual(core.load_version('os:name'), os.name)
         self.assertEqual(core.load_version('os:getcwd'), os.getcwd())
@@ -202,6 +237,31 @@ class CoreTestCase(SCMVerTestCase):
                 'scm.tag': 'spam-*.*',
             })
 
+            with path.open('a') as fp:
+                self.write_sync(fp, """\
+                    cache-dir = ".cache"
+                """)
+            self.assertEqual(core.load_project(path), {
+                'root': str(path.parent / '..'),
+                'write_to': 'kebab-case',
+                'scm.tag': 'spam-*.*',
+                'cache_dir': str(path.parent / '.cache'),
+            })
+
+            with path.open('a') as fp:
+                self.write_sync(fp, """\
+                    ceiling-dirs = ".."
+                    one-filesystem = true
+                """)
+            self.assertEqual(core.load_project(path), {
+                'root': str(path.parent / '..'),
+                'write_to': 'kebab-case',
+                'scm.tag': 'spam-*.*',
+                'cache_dir': str(path.parent / '.cache'),
+                'ceiling_dirs': [str(path.parent / '..')],
+                'one_filesystem': True,
+            })
+
             # ImportError
             if sys.version_info >= (3, 11):
                 toml = 'tomllib'
@@ -213,6 +273,62 @@ class CoreTestCase(SCMVerTestCase):
             sys.modules[toml] = None
             self.assertIsNone(core.load_project(path))
 
+    @requires_tomli
+    def test_load_project_cache(self):
+        with self.tempdir() as path:
+            path = Path(path) / 'pyproject.toml'
+            with path.open('w') as fp:
+                self.write_sync(fp, """\
+                    [build-system]
+                    build-backend = "setuptools.build_meta"
+                """)
+            with unittest.mock.patch('scmver.core._toml') as toml:
+                self.assertIsNone(core.load_project(path))
+                self.assertEqual(toml.call_count, 0)
+
+            with path.open('a') as fp:
+                self.write_sync(fp, """\
+                    [tool.scmver]
+                    spec = "micro"
+                """)
+            scmver = core.load_project(path)
+            self.assertEqual(scmver, {
+                'root': str(path.parent),
+                'spec': 'micro',
+            })
+            with unittest.mock.patch.object(core._toml(), 'loads') as loads:
+                scmver['spec'] = 'minor'
+                self.assertEqual(core.load_project(path), {
+                    'root': str(path.parent),
+                    'spec': 'micro',
+                })
+                self.assertEqual(loads.call_count, 0)
+
+            with path.open('a') as fp:
+                self.write_sync(fp, """\
+                    local = "{local:%Y%m%d}"
+                """)
+            self.assertEqual(core.load_project(path), {
+                'root': str(path.parent),
+                'spec': 'micro',
+                'local': '{local:%Y%m%d}',
+            })
+
+    def test_select_tag(self):
+        tags = ['release-2024', 'v1.0rc1', 'v1.0', 'v0.9', 'v1.0.post']
+        self.assertEqual(core.select_tag(tags), 'release-2024')
+        self.assertEqual(core.select_tag(tags, 'scm-default'), 'release-2024')
+        self.assertEqual(core.select_tag(tags, 'newest'), 'release-2024')
+        self.assertEqual(core.select_tag(tags, 'highest-pep440'), 'v1.0.post')
+        self.assertEqual(core.select_tag(['spam-1.0', 'spam-1.1', 'spam-1.0.1'], 'highest-pep440'), 'spam-1.1')
+        self.assertEqual(core.select_tag(['spam', 'eggs'], 'highest-pep440'), 'spam')
+        self.assertIsNone(core.select_tag([], 'highest-pep440'))
+
+        with self.assertRaises(ValueError):
+            core.select_tag(tags, 'oldest')
+        with self.assertRaises(ValueError):
+            core.stat('.', tag_select='oldest')
+
     def test_stat(self):
         rev = self.revision(b'scmver.core.stat')
 
@@ -319,8 +435,259 @@ class CoreTestCase(SCMVerTestCase):
                 """)
             self.assertEqual(core.stat(path), info)
 
+    def test_get_version_shared(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            (path / '.git').mkdir()
+            info = core.SCMInfo('v1.0', 0, None, False, 'master')
+
+            with (unittest.mock.patch('scmver.core.stat', return_value=info) as stat,
+                  unittest.mock.patch('scmver.git.dirty', return_value=False) as dirty):
+                self.assertEqual(core.get_version(path, cache_dir=str(path)), '1.0')
+                self.assertEqual(core.get_version(path, cache_dir=str(path)), '1.0')
+                self.assertEqual(stat.call_count, 1)
+                self.assertEqual(dirty.call_count, 1)
+                # another process
+                with unittest.mock.patch.dict('scmver.cache._infos', clear=True):
+                    self.assertEqual(core.get_version(path, cache_dir=str(path), spec='minor'), '1.0')
+                self.assertEqual(stat.call_count, 1)
+                # other options
+                self.assertEqual(core.get_version(path, cache_dir=str(path), tag_select='newest'), '1.0')
+                self.assertEqual(stat.call_count, 2)
+                # edited
+                dirty.return_value = True
+                self.assertEqual(core.get_version(path, cache_dir=str(path), local='dirty'), '1.0+dirty')
+                self.assertEqual(stat.call_count, 2)
+                dirty.return_value = False
+                # updated
+                with (path / '.git' / 'HEAD').open('w') as fp:
+                    fp.write('ref: refs/heads/master\n')
+                stat.return_value = info._replace(distance=1)
+                self.assertEqual(core.get_version(path, cache_dir=str(path)), '1.0.post')
+                self.assertEqual(stat.call_count, 3)
+                # unknown state
+                dirty.return_value = None
+                self.assertEqual(core.get_version(path, cache_dir=str(path)), '1.0.post')
+                self.assertEqual(stat.call_count, 4)
+
+            # the cache directory is created
+            cache_dir = path / 'spam' / 'cache'
+            with (unittest.mock.patch('scmver.core.stat', return_value=info) as stat,
+                  unittest.mock.patch('scmver.git.dirty', return_value=False),
+                  unittest.mock.patch.dict('scmver.cache._infos', clear=True)):
+                self.assertEqual(core.get_version(path, cache_dir=str(cache_dir)), '1.0')
+                self.assertEqual(len(list(cache_dir.glob('info-*.json'))), 1)
+                # another process
+                cache._infos.clear()
+                self.assertEqual(core.get_version(path, cache_dir=str(cache_dir)), '1.0')
+                self.assertEqual(stat.call_count, 1)
+
+            # not shared without a cache directory
+            with (unittest.mock.patch.dict('os.environ', {'SCMVER_CACHE_DIR': ''}),
+                  unittest.mock.patch('scmver.core.stat', return_value=info) as stat):
+                self.assertEqual(core.get_version(path), '1.0')
+                self.assertEqual(core.get_version(path), '1.0')
+                self.assertEqual(stat.call_count, 2)
+
+    @unittest.skipUnless(cache.fcntl, 'requires fcntl')
+    def test_get_version_single_flight(self):
+        def stat(*args, **kwargs):
+            time.sleep(0.2)
+            return core.SCMInfo('v1.0')
+
+        with self.tempdir() as path:
+            path = Path(path)
+            (path / '.git').mkdir()
+
+            # the cache directory does not exist yet
+            for cache_dir in (path, path / 'cache'):
+                with (self.subTest(cache_dir=cache_dir),
+                      unittest.mock.patch('scmver.core.stat', side_effect=stat) as m,
+                      unittest.mock.patch('scmver.git.dirty', return_value=False),
+                      unittest.mock.patch.dict('scmver.cache._infos', clear=True),
+                      concurrent.futures.ThreadPoolExecutor(8) as pool):
+                    # each thread behaves as another process
+                    vers = list(pool.map(lambda d: core.get_version(path, cache_dir=str(d)), [cache_dir] * 8))
+                    self.assertEqual(vers, ['1.0'] * 8)
+                    self.assertEqual(m.call_count, 1)
+
+    def test_get_version_lazy(self):
+        def branch():
+            raise AssertionError
+
+        with self.tempdir() as path:
+            path = Path(path)
+            info = core.LazySCMInfo('v1.0', 1, 'abc', True, branch=branch)
+            with unittest.mock.patch('scmver.core.stat', return_value=info):
+                self.assertEqual(core.get_version(path, local='{revision}', write_to='_version.py'), '1.0.post+abc')
+                with self.assertRaises(AssertionError):
+                    core.get_version(path, local='{branch}')
+                with self.assertRaises(AssertionError):
+                    core.get_version(path, write_to='_version.py', template='{version} ({branch})')
+                with self.assertRaises(AssertionError):
+                    core.get_version(path, local=lambda info: info.branch)
+
+            (path / '.git').mkdir()
+            info = core.LazySCMInfo('v1.0', 1, 'abc', True, branch=lambda: 'master')
+            with (unittest.mock.patch('scmver.core.stat', return_value=info) as stat,
+                  unittest.mock.patch('scmver.git.dirty', return_value=True)):
+                self.assertEqual(core.get_version(path, local='{revision}', cache_dir=str(path)), '1.0.post+abc')
+                self.assertEqual(core.get_version(path, local='{revision}', cache_dir=str(path)), '1.0.post+abc')
+                self.assertEqual(stat.call_count, 1)
+                self.assertEqual(core.get_version(path, local='{branch}', cache_dir=str(path)), '1.0.post+master')
+                self.assertEqual(stat.call_count, 2)
+
+    def test_lazy_scminfo(self):
+        calls = []
+
+        def branch():
+            calls.append(util._limit.get())
+            return 'master'
+
+        with util.limit(5, deadline=60):
+            info = core.LazySCMInfo('v1.0', 1, 'abc', branch=branch)
+        self.assertIsInstance(info, core.SCMInfo)
+        self.assertEqual(info.tag, 'v1.0')
+        self.assertFalse(info.dirty)
+        self.assertEqual(calls, [])
+        # resolved in the context where it is created
+        self.assertEqual(info.branch, 'master')
+        self.assertEqual(info.branch, 'master')
+        self.assertEqual(len(calls), 1)
+        # without the deadline
+        self.assertEqual(calls[0], (5, None))
+
+        expected = core.SCMInfo('v1.0', 1, 'abc', False, 'master')
+        self.assertEqual(info, expected)
+        self.assertEqual(expected, info)
+        self.assertEqual(tuple(info), tuple(expected))
+        self.assertEqual(info[4], 'master')
+        self.assertEqual(info[-2:], (False, 'master'))
+        tag, _, _, _, branch = info
+        self.assertEqual((tag, branch), ('v1.0', 'master'))
+        self.assertEqual(info._asdict(), expected._asdict())
+        self.assertEqual(info._replace(distance=2), expected._replace(distance=2))
+        self.assertEqual(core.LazySCMInfo._make(expected), expected)
+        self.assertEqual(repr(info), repr(expected))
+        self.assertEqual(hash(info), hash(expected))
+        self.assertEqual(pickle.loads(pickle.dumps(info)), expected)
+
+        info = core.LazySCMInfo(branch=branch)
+        self.assertEqual(info.resolve(('tag', 'dirty')), core.SCMInfo())
+        self.assertEqual(info.resolve(), core.SCMInfo(branch='master'))
+
+        # used after the deadline
+        with util.limit(deadline=0):
+            info = core.LazySCMInfo(branch=lambda: util.exec_((sys.executable, '-c', 'print("master")'))[0].strip())
+        self.assertEqual(info.branch, 'master')
+
+    @unittest.mock.patch.dict('scmver.cache._memo', clear=True)
+    def test_stat_ttl(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            (path / '.git').mkdir()
+            info = core.SCMInfo('v1.0')
+
+            with unittest.mock.patch('scmver.git.parse', return_value=info) as parse:
+                self.assertEqual(core.stat(path, ttl=60), info)
+                self.assertEqual(core.stat(path / '.', ttl='60'), info)
+                self.assertEqual(parse.call_count, 1)
+                self.assertEqual(core.stat(path, ttl=60, tag_select='newest'), info)
+                self.assertEqual(parse.call_count, 2)
+                self.assertNotIn('ttl', parse.call_args.kwargs)
+                self.assertEqual(core.get_version(path, ttl=60), '1.0')
+                self.assertEqual(parse.call_count, 2)
+                # not shared between the processes of a build
+                self.assertEqual(core.get_version(path, ttl=60, cache_dir=str(path)), '1.0')
+                self.assertEqual(core.get_version(path, ttl=60, cache_dir=str(path)), '1.0')
+                self.assertEqual(parse.call_count, 3)
+                self.assertEqual(list(path.glob('info-*')), [])
+
+                self.assertEqual(core.stat(path, ttl=0), info)
+                self.assertEqual(core.stat(path, ttl=0), info)
+                self.assertEqual(parse.call_count, 5)
+
+            # resolved before it is memoized
+            info = core.LazySCMInfo('v1.0', branch=lambda: 'master')
+            with unittest.mock.patch('scmver.git.parse', return_value=info):
+                rv = core.stat(path, ttl=60, **{'git.tag': 'v*'})
+            self.assertNotIsInstance(rv, core.LazySCMInfo)
+            self.assertEqual(rv, core.SCMInfo('v1.0', branch='master'))
+
+    @unittest.mock.patch.dict('os.environ')
+    @unittest.mock.patch.dict('scmver.core._outside', clear=True)
+    def test_stat_ceiling_dirs(self):
+        os.environ.pop('SCMVER_CEILING_DIRECTORIES', None)
+        with self.tempdir() as path:
+            path = Path(path)
+            (path / '.git').mkdir()
+            root = path / 'a' / 'b'
+            root.mkdir(parents=True)
+            info = core.SCMInfo('v1.0')
+
+            with unittest.mock.patch('scmver.git.parse', return_value=info):
+                self.assertEqual(core.stat(root), info)
+                self.assertEqual(core.stat(root, ceiling_dirs=[str(path.parent)]), info)
+                self.assertIsNone(core.stat(root, ceiling_dirs=[str(path)]))
+                self.assertIsNone(core.stat(root, ceiling_dirs=os.pathsep.join(('', 'spam', str(path)))))
+                os.environ['SCMVER_CEILING_DIRECTORIES'] = str(path)
+                self.assertIsNone(core.stat(root))
+                self.assertIsNone(core.get_version(root))
+                self.assertEqual(core.get_version(root, fallback=lambda: '1.0'), '1.0')
+
+    @unittest.mock.patch.dict('scmver.core._outside', clear=True)
+    def test_stat_outside(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            root = path / 'a' / 'b'
+            root.mkdir(parents=True)
+            for p in (root, root.parent):
+                os.utime(p, (0, 0))
+            kwargs = {'ceiling_dirs': [str(path)]}
+
+            with unittest.mock.patch('os.path.exists', wraps=os.path.exists) as exists:
+                self.assertIsNone(core.stat(root, **kwargs))
+                self.assertGreater(exists.call_count, 0)
+                exists.reset_mock()
+                self.assertIsNone(core.stat(root, **kwargs))
+                self.assertEqual(exists.call_count, 0)
+                # other options
+                self.assertIsNone(core.stat(root, **kwargs, one_filesystem=True))
+                self.assertGreater(exists.call_count, 0)
+
+            info = core.SCMInfo('v1.0')
+            with unittest.mock.patch('scmver.git.parse', return_value=info):
+                (root.parent / '.git').mkdir()
+                self.assertEqual(core.stat(root, **kwargs), info)
+
+            # recently modified
+            (root.parent / '.git').rmdir()
+            with unittest.mock.patch('os.path.exists', wraps=os.path.exists) as exists:
+                self.assertIsNone(core.stat(root, **kwargs))
+                exists.reset_mock()
+                self.assertIsNone(core.stat(root, **kwargs))
+                self.assertGreater(exists.call_count, 0)
+
+    def test_stat_timeout(self):
+        with self.tempdir() as path:
+            path = Path(path)
+            (path / '.git').mkdir()
+
+            def parse(root, name, **kwargs):
+                return util.exec_((sys.executable, '-c', 'import time; time.sleep(10)'))
+
+            with unittest.mock.patch('scmver.git.parse', side_effect=parse):
+                with self.assertRaises(TimeoutError):
+                    core.stat(path, timeout=0.5)
+                with self.assertRaises(TimeoutError):
+                    core.stat(path, deadline='0.5')
+                with self.assertRaises(TimeoutError):
+                    core.get_version(path, deadline=0.5)
+
+                self.assertEqual(core.get_version(path, deadline=0.5, fallback=lambda: '1.0'), '1.0')
+
     def test_invalid_version(self):
-        for v in ('', 'version', '1.0-', '1.0+', '1.0+_'):
+        for v in ('', 'version', '1.0-', '1.0+', '1.0+_', '1.0+a..b'):
             with self.assertRaises(core.VersionError):
                 core.Version(v)
 
@@ -437,6 +804,213 @@ class CoreTestCase(SCMVerTestCase):
         self.assertVersion('1.0+00100', '1.0+100')
         self.assertVersion('1.0+2019-02-10', '1.0+2019.2.10')
 
+    def test_parse_many(self):
+        versions = ['1.0', 'v1.2.3', 'spam', ' 2 ', '1.0rc1', '1..0', '', '1.0+local']
+        rv = list(core.Version.parse_many(versions))
+        self.assertEqual(len(rv), len(versions))
+        for v, e in zip(versions, rv):
+            with self.subTest(version=v):
+                if v in ('spam', '1..0', ''):
+                    self.assertIsInstance(e, core.VersionError)
+                else:
+                    self.assertIs(type(e), core.Version)
+                    self.assertEqual(str(e), str(core.Version(v)))
+
+        rv = list(core.FrozenVersion.parse_many(iter(('1.0', '_'))))
+        self.assertIs(type(rv[0]), core.FrozenVersion)
+        self.assertIsInstance(rv[1], core.VersionError)
+
+    def test_release_version_fast_path(self):
+        for v in ('0', '1.0', 'v1.2.3', 'V1.2.3', ' 10.20.30 ', '1.02'):
+            with self.subTest(version=v):
+                m = core._pep440_re.match(v.strip())
+                self.assertEqual(core.Version(v).release, tuple(map(int, m.group('release').split('.'))))
+
+        for v in ('1.', '.1', '1..0', 'vv1', '1.0\u0661', '\u0661', '1.0-1', '1_0'):
+            with self.subTest(version=v):
+                self.assertIsNone(core._release_of(v))
+
+    def test_compare_version(self):
+        versions = [
+            '1.0.dev456', '1.0a1', '1.0a2.dev456', '1.0a12.dev456', '1.0a12',
+            '1.0b1.dev456', '1.0b2', '1.0b2.post345.dev456', '1.0b2.post345', '1.0b2-346',
+            '1.0c1.dev456', '1.0c1', '1.0rc2', '1.0c3', '1.0', '1.0.post456.dev34', '1.0.post456',
+            '1.1.dev1', '1.2+123abc', '1.2+123abc456', '1.2+abc', '1.2+abc123', '1.2+abc123def',
+            '1.2+1234.abc', '1.2+123456', '1.2.r32+123456', '1.2.rev33+123456',
+            '1!0.dev1', '1!1.0',
+        ]
+        for i, a in enumerate(versions):
+            for j, b in enumerate(versions):
+                with self.subTest(a=a, b=b):
+                    va = core.Version(a)
+                    vb = core.FrozenVersion(b)
+                    self.assertEqual(va < vb, i < j)
+                    self.assertEqual(va <= vb, i <= j)
+                    self.assertEqual(va == vb, i == j)
+                    self.assertEqual(va != vb, i != j)
+                    self.assertEqual(va >= vb, i >= j)
+                    self.assertEqual(va > vb, i > j)
+
+        self.assertEqual([str(v) for v in sorted(map(core.Version, reversed(versions)))], versions)
+        self.assertEqual(str(max(map(core.FrozenVersion, versions))), '1!1.0')
+
+        for a, b in (
+            ('1', '1.0.0'),
+            ('v1.0', '1.0'),
+            ('1.0RC', '1.0rc0'),
+            ('1.0-preview.1', '1.0rc1'),
+            ('1.0.post', '1.0-0'),
+            ('1.0.dev', '1.0.dev0'),
+            ('1.0+ABC.01', '1.0+abc-1'),
+        ):
+            with self.subTest(a=a, b=b):
+                self.assertEqual(core.Version(a), core.Version(b))
+                self.assertEqual(hash(core.FrozenVersion(a)), hash(core.FrozenVersion(b)))
+
+        v = core.Version('1.0')
+        w = core.Version('1.0.post')
+        self.assertLess(v, w)
+        v.update('post', 2)
+        self.assertGreater(v, w)
+
+        self.assertNotEqual(core.Version('1.0'), '1.0')
+        with self.assertRaises(TypeError):
+            operator.lt(core.Version('1.0'), '1.0')
+        with self.assertRaises(TypeError):
+            hash(core.Version('1.0'))
+
+    def test_frozen_version(self):
+        v = core.FrozenVersion('1.0RC1')
+        self.assertEqual(repr(v), '<FrozenVersion(1.0RC1)>')
+        self.assertEqual(str(v), '1.0RC1')
+        self.assertIs(str(v), str(v))
+        self.assertEqual(v.pre, ('RC', 1))
+        self.assertIsInstance(v, core.Version)
+
+        self.assertEqual(v, core.FrozenVersion('1.0RC1'))
+        self.assertNotEqual(v, core.FrozenVersion('1.0rc2'))
+        self.assertEqual(hash(v), hash(core.FrozenVersion('1.0RC1')))
+        self.assertEqual(len({v, core.FrozenVersion('1.0RC1'), core.FrozenVersion('1.0')}), 2)
+        self.assertEqual({v: 1}[core.Version('1.0RC1').freeze()], 1)
+        self.assertEqual(pickle.loads(pickle.dumps(v)), v)
+
+        for name in ('epoch', 'release', 'local', '_pre', '_str'):
+            with self.subTest(name=name):
+                with self.assertRaises(AttributeError):
+                    setattr(v, name, None)
+                with self.assertRaises(AttributeError):
+                    delattr(v, name)
+        with self.assertRaises(AttributeError):
+            v.update('pre')
+
+        n = v.normalize()
+        self.assertIsInstance(n, core.FrozenVersion)
+        self.assertEqual(str(n), '1.0rc1')
+        self.assertEqual(str(v), '1.0RC1')
+
+        b = v.bump('minor.dev')
+        self.assertIsInstance(b, core.FrozenVersion)
+        self.assertEqual(str(b), '1.1.dev')
+        self.assertEqual(str(v), '1.0RC1')
+
+        m = v.thaw()
+        self.assertIs(type(m), core.Version)
+        m.update('pre')
+        self.assertEqual(str(m), '1.0RC2')
+        self.assertEqual(str(v), '1.0RC1')
+        self.assertIs(v.freeze(), v)
+
+        with self.assertRaises(core.VersionError):
+            core.FrozenVersion('version')
+
+    def test_normalize_update_property(self):
+        def normalize(v):
+            # reference: round-trip through str() and re-parse
+            v = core.Version(str(v).lower())
+            pre = ('', core._PRE[v._pre[1]], '', max(v._pre[3], 0)) if v._pre else None
+            post = ('.', 'post', '', max(v._post[3], 0)) if v._post else None
+            dev = ('.', 'dev', '', max(v._dev[3], 0)) if v._dev else None
+            local = '.'.join(str(int(s)) if s.isdigit() else s for s in core._sep_re.split(v.local)) if v.local else None
+            return (v.epoch, v.release, pre, post, dev, local)
+
+        def update(v, spec, value):
+            # reference: slice and concatenate the release segment
+            def add(n, val):
+                return (val if val > 0 else -1) if n < 0 else n + val
+
+            release, pre, post, dev = v.release, v._pre, v._post, v._dev
+            spec = spec.lower()
+            if spec.endswith('.dev'):
+                i = {'major': 1, 'minor': 2, 'micro': 3, 'patch': 3}[spec[:-4]]
+                release = release[:i] + (0,) * (len(release) - i)
+                spec, dev_value, value = spec[:-4], value, 1
+            else:
+                dev_value = None
+            if spec == 'major':
+                release = (max(release[0] + value, 0),) + release[1:]
+                pre = post = dev = None
+            elif spec == 'minor':
+                if len(release) < 2:
+                    release += (max(value, 0),)
+                else:
+                    release = release[:1] + (max(release[1] + value, 0),) + release[2:]
+                pre = post = dev = None
+            elif spec in ('micro', 'patch'):
+                if len(release) < 2:
+                    release += (0, max(value, 0))
+                elif len(release) < 3:
+                    release += (max(value, 0),)
+                else:
+                    release = release[:2] + (max(release[2] + value, 0),) + release[3:]
+                pre = post = dev = None
+            elif spec == 'pre':
+                pre = pre[:3] + (add(pre[3], value),)
+            elif spec == 'dev':
+                dev = dev[:3] + (add(dev[3], value),)
+            elif spec == 'post':
+                if post:
+                    post = post[:3] + ((add(post[3], value),) if post[1] else (max(post[3] + value, 0),))
+                elif value >= 0:
+                    post = ('.', 'post', '', value if value > 1 else -1)
+            if dev_value is not None:
+                dev = ('.', 'dev', '', dev_value if dev_value > 1 else -1)
+            return (v.epoch, release, pre, post, dev, v.local)
+
+        rand = random.Random(0)
+
+        def version():
+            v = '.'.join(str(rand.randrange(3)) for _ in range(rand.randint(1, 5)))
+            if rand.random() < 0.3:
+                v += rand.choice(('', '.', '-', '_'))
+                v += rand.choice(('a', 'Alpha', 'b', 'BETA', 'c', 'pre', 'Preview', 'rc')) + rand.choice(('', '0', '1', '12'))
+            if rand.random() < 0.3:
+                v += rand.choice(('-1', '.post', 'r2', '-rev3', '_POST0'))
+            if rand.random() < 0.3:
+                v += rand.choice(('', '.', '-', '_')) + rand.choice(('dev', 'DEV')) + rand.choice(('', '0', '7'))
+            if rand.random() < 0.1:
+                v = f'{rand.randrange(3)}!{v}'
+            return v
+
+        specs = ('major', 'minor', 'micro', 'patch', 'pre', 'post', 'dev',
+                 'major.dev', 'minor.dev', 'micro.dev', 'patch.dev', 'MINOR', 'Micro.Dev')
+        for _ in range(2000):
+            s = version()
+            v = core.Version(s)
+            self.assertEqual(v.normalize()._fields(), normalize(v), s)
+
+            spec = rand.choice(specs)
+            value = rand.randint(-2, 3)
+            if ((spec == 'pre' and not v.pre)
+                or (spec == 'dev' and not v.dev)
+                or (spec.lower().endswith('.dev') and value < 0)):
+                with self.assertRaises(core.VersionError):
+                    v.update(spec, value)
+                continue
+            e = update(v, spec, value)
+            v.update(spec, value)
+            self.assertEqual(v._fields(), e, (s, spec, value))
+            self.assertEqual(str(core.Version(str(v))), str(v))
+
     def test_update_version(self):
         v = core.Version('1.0')
         v.update('')
@@ -590,3 +1164,32 @@ class CoreTestCase(SCMVerTestCase):
         for spec in ('major.dev', 'minor.dev', 'micro.dev', 'patch.dev'):
             with self.assertRaises(core.VersionError):
                 core.Version('1.0').update(spec, -1)
+
+    @unittest.skipUnless(packaging, 'requires packaging')
+    def test_version_corpus(self):
+        with open(os.path.join(os.path.dirname(__file__), 'data', 'versions.txt'), encoding='utf-8') as fp:
+            versions = [l for l in fp.read().splitlines() if l and not l.startswith('#')]
+
+        valid = []
+        for s in versions:
+            with self.subTest(version=s):
+                try:
+                    pv = packaging.version.Version(s)
+                except packaging.version.InvalidVersion:
+                    with self.assertRaises(core.VersionError):
+                        core.Version(s)
+                    continue
+
+                v = core.Version(s)
+                self.assertEqual(str(v.normalize()), str(pv))
+                self.assertEqual(v.release, pv.release)
+                self.assertEqual(v.local, pv.local and s.partition('+')[2])
+                valid.append((v, pv))
+                if not v.local:
+                    for spec in ('major', 'minor.dev', 'post', 'dev' if v.dev else 'micro'):
+                        w = core.Version(s)
+                        w.update(spec)
+                        self.assertEqual(str(w.normalize()), str(packaging.version.Version(str(w))))
+
+        self.assertEqual([str(v.normalize()) for v, _ in sorted(valid, key=lambda p: p[0])],
+                         [str(pv) for _, pv in sorted(valid, key=lambda p: p[1])])
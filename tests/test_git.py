@@ -6,6 +6,7 @@
 #   SPDX-License-Identifier: MIT
 #
 
+import concurrent.futures
 import os
 from pathlib import Path
 import unittest
@@ -52,6 +53,9 @@ class GitTestCase(SCMVerTestCase):
         self.assertFalse(info.dirty)
         self.assertEqual(info.branch, 'master')
 
+        with unittest.mock.patch.object(git, '_version', return_value=(1, 7, 1, 0)):
+            self.assertEqual(git.parse(Path(), name='.git'), info)
+
     def test_simple(self):
         self.init()
         self.touch('file')
@@ -86,6 +90,51 @@ class GitTestCase(SCMVerTestCase):
                 self.assertFalse(info.dirty)
                 self.assertEqual(info.branch, 'master')
 
+    def test_match_many(self):
+        self.init()
+        self.touch('file')
+        git.run('add', '.')
+        git.run('commit', '-m', '.')
+        git.run('tag', 'v1.0')
+        git.run('tag', 'spam-1.0')
+        git.run('tag', 'eggs-1.0')
+
+        for kwargs, tag in (
+            ({'git.tag': ['spam-*.*', 'eggs-*.*']}, ('spam-1.0', 'eggs-1.0')),
+            ({'git.exclude': ['v*.*', 'spam-*']}, ('eggs-1.0',)),
+            ({'git.tag': ['spam-*.*', 'eggs-*.*'], 'git.exclude': 'eggs-*'}, ('spam-1.0',)),
+        ):
+            with self.subTest(kwargs=kwargs):
+                info = git.parse(Path(), name='.git', **kwargs)
+                self.assertIn(info.tag, tag)
+                self.assertEqual(info.distance, 0)
+
+    def test_select(self):
+        self.init()
+        self.touch('file')
+        git.run('add', '.')
+        git.run('commit', '-m', '.', env={'GIT_COMMITTER_DATE': '2024-01-01T00:00:00Z'})
+        git.run('tag', '-m', '.', 'v1.0rc1', env={'GIT_COMMITTER_DATE': '2024-01-02T00:00:00Z'})
+        git.run('tag', '-m', '.', 'v1.0', env={'GIT_COMMITTER_DATE': '2024-01-04T00:00:00Z'})
+        git.run('tag', '-m', '.', 'v0.9', env={'GIT_COMMITTER_DATE': '2024-01-03T00:00:00Z'})
+        git.run('tag', '-m', '.', 'release-2024', env={'GIT_COMMITTER_DATE': '2024-01-05T00:00:00Z'})
+        self.touch('spam')
+        git.run('add', '.')
+        git.run('commit', '-m', '.')
+
+        for kwargs, tag in (
+            ({'tag_select': 'highest-pep440'}, 'v1.0'),
+            ({'tag_select': 'newest'}, 'release-2024'),
+            ({'tag_select': 'newest', 'git.tag': 'v*'}, 'v1.0'),
+            ({'tag_select': 'newest', 'git.exclude': ['release-*', 'v1.0']}, 'v0.9'),
+        ):
+            with self.subTest(kwargs=kwargs):
+                info = git.parse(Path(), name='.git', **kwargs)
+                self.assertEqual(info.tag, tag)
+                self.assertEqual(info.distance, 1)
+                self.assertFalse(info.dirty)
+                self.assertEqual(info.branch, 'master')
+
     def test_i18n(self):
         self.init()
         git.run('checkout', '-b', '\u30d6\u30e9\u30f3\u30c1')
@@ -123,10 +172,113 @@ class GitTestCase(SCMVerTestCase):
         self.touch('file')
 
         self.assertEqual(git.parse(Path(), name='.git'), core.SCMInfo(branch='master'))
+        self.assertFalse(git.dirty(Path(), name='.git'))
 
         git.run('add', '.')
 
         self.assertEqual(git.parse(Path(), name='.git'), core.SCMInfo(dirty=True, branch='master'))
+        self.assertTrue(git.dirty(Path(), name='.git'))
+        self.assertIsNone(git.dirty(Path(), name='_'))
+
+    def test_shared(self):
+        self.init()
+        self.touch('file')
+        git.run('add', '.')
+        git.run('commit', '-m', '.')
+        git.run('tag', 'v1.0')
+        cache_dir = self.root.parent / f'{self.root.name}.cache'
+        cache_dir.mkdir()
+        try:
+            self.assertEqual(core.get_version(self.root, local='dirty', cache_dir=str(cache_dir)), '1.0')
+            with open('file', 'w') as fp:
+                fp.write('spam')
+            self.assertEqual(core.get_version(self.root, local='dirty', cache_dir=str(cache_dir)), '1.0+dirty')
+            git.run('commit', '-am', '.')
+            self.assertEqual(core.get_version(self.root, local='dirty', cache_dir=str(cache_dir)), '1.0.post')
+            git.run('tag', 'v1.1')
+            self.assertEqual(core.get_version(self.root, local='dirty', cache_dir=str(cache_dir)), '1.1')
+
+            if git.version() >= (2, 5):
+                wt = self.root.parent / f'{self.root.name}.wt'
+                git.run('worktree', 'add', str(wt))
+                try:
+                    self.assertEqual(core.get_version(wt, local='dirty', cache_dir=str(cache_dir)), '1.1')
+                    with open(wt / 'file', 'w') as fp:
+                        fp.write('eggs')
+                    self.assertEqual(core.get_version(wt, local='dirty', cache_dir=str(cache_dir)), '1.1+dirty')
+                    git.run('commit', '-am', '.', cwd=wt)
+                    self.assertEqual(core.get_version(wt, local='dirty', cache_dir=str(cache_dir)), '1.1.post')
+                    # refs are shared with the main worktree
+                    git.run('tag', 'v1.2', git.run('rev-parse', 'HEAD', cwd=wt)[0].strip())
+                    self.assertEqual(core.get_version(wt, local='dirty', cache_dir=str(cache_dir)), '1.2')
+                finally:
+                    self.rmtree(wt)
+        finally:
+            self.rmtree(cache_dir)
+
+    def test_lazy_branch(self):
+        self.init()
+        self.touch('file')
+        git.run('add', '.')
+        git.run('commit', '-m', '.')
+        git.run('tag', 'v1.0')
+
+        with util.trace() as events:
+            info = git.parse(Path(), name='.git')
+            self.assertEqual(core.next_version(info), '1.0')
+            self.assertEqual(len([ev for ev in events if ev.name == 'exec']), 2)
+            self.assertEqual(info.branch, 'master')
+            self.assertEqual(len([ev for ev in events if ev.name == 'exec']), 3)
+
+    def test_parallel(self):
+        self.init()
+        for i in range(100):
+            with open(f'file{i}', 'w') as fp:
+                fp.write(str(i))
+        git.run('add', '.')
+        git.run('commit', '-m', '.')
+        git.run('tag', 'v1.0')
+        with open('file0', 'w') as fp:
+            fp.write('spam')
+        # stale stat information makes git refresh the index
+        for i in range(1, 100):
+            os.utime(f'file{i}', (0, 0))
+        index = os.stat('.git/index')
+
+        with concurrent.futures.ThreadPoolExecutor(64) as pool:
+            infos = list(pool.map(lambda _: core.stat(self.root), range(64)))
+        self.assertEqual(len(set(infos)), 1)
+        self.assertEqual(infos[0].tag, 'v1.0')
+        self.assertTrue(infos[0].dirty)
+        self.assertEqual(infos[0].branch, 'master')
+        # read-only
+        self.assertEqual(os.stat('.git/index').st_mtime_ns, index.st_mtime_ns)
+        self.assertFalse(os.path.exists('.git/index.lock'))
+
+    def test_replay(self):
+        self.init()
+        self.touch('file')
+        git.run('add', '.')
+        git.run('commit', '-m', '.')
+        git.run('tag', 'v1.0')
+        with open('file', 'w') as fp:
+            fp.write('spam')
+        git.run('add', '.')
+
+        cassette = self.root.parent / f'{self.root.name}.json'
+        try:
+            with util.record(cassette):
+                info = git.parse(Path(), name='.git').resolve()
+            self.assertEqual(info.tag, 'v1.0')
+            self.assertTrue(info.dirty)
+
+            self.rmtree('.git')
+            with (util.replay(cassette),
+                  unittest.mock.patch('subprocess.run', side_effect=AssertionError)):
+                for _ in range(3):
+                    self.assertEqual(git.parse(Path(), name='.git'), info)
+        finally:
+            os.unlink(cassette)
 
     def test_version(self):
         self.assertGreaterEqual(len(git.version()), 4)
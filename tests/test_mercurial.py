@@ -167,6 +167,32 @@ class MercurialTestCase(SCMVerTestCase):
             with self.assertRaises(ValueError):
                 hg.parse(Path(), name='.hg_archival.txt', **{'mercurial.tag': r'__scmver__'})
 
+    def test_select(self):
+        self.init()
+        self.touch('file')
+        hg.run('add', '.')
+        hg.run('commit', '-m', '.')
+        hg.run('tag', '-r', '0', 'v1.0')
+        hg.run('tag', '-r', '0', 'v0.9')
+        hg.run('tag', '-r', '0', 'v1.0rc1')
+
+        for select, tag in (
+            ('highest-pep440', 'v1.0'),
+            ('newest', 'v1.0rc1'),
+        ):
+            with self.subTest(select=select):
+                info = hg.parse(Path(), name='.hg', tag_select=select)
+                self.assertEqual(info.tag, tag)
+                self.assertEqual(info.distance, 3)
+                self.assertIsNotNone(info.revision)
+                self.assertFalse(info.dirty)
+                self.assertEqual(info.branch, 'default')
+
+                with self.archive():
+                    info = hg.parse(Path(), name='.hg_archival.txt', tag_select=select)
+                    self.assertEqual(info.tag, tag)
+                    self.assertEqual(info.distance, 3)
+
     def test_i18n(self):
         self.check_locale()
 
@@ -197,10 +223,13 @@ class MercurialTestCase(SCMVerTestCase):
         self.touch('file')
 
         self.assertEqual(hg.parse(Path(), name='.hg'), core.SCMInfo(branch='default'))
+        self.assertFalse(hg.dirty(Path(), name='.hg'))
 
         hg.run('add', '.')
 
         self.assertEqual(hg.parse(Path(), name='.hg'), core.SCMInfo(dirty=True, branch='default'))
+        self.assertTrue(hg.dirty(Path(), name='.hg'))
+        self.assertIsNone(hg.dirty(Path(), name='.hg_archival.txt'))
 
     @unittest.mock.patch('scmver.mercurial.run')
     def test_lt_hg36(self, run):
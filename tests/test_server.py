@@ -0,0 +1,107 @@
+#
+# test_server
+#
+#   Copyright (c) 2026 Akinori Hattori <hattya@gmail.com>
+#
+#   SPDX-License-Identifier: MIT
+#
+
+import os
+from pathlib import Path
+import socket
+import threading
+import unittest
+import unittest.mock
+
+from scmver import core
+from base import SCMVerTestCase
+
+if hasattr(socket, 'AF_UNIX'):
+    from scmver import server
+else:
+    server = None
+
+
+@unittest.skipUnless(server, 'requires AF_UNIX')
+class ServerTestCase(SCMVerTestCase):
+
+    def setUp(self):
+        self._dir = self.tempdir()
+        self.root = Path(self._dir.name)
+        self.path = str(self.root / 'scmver.sock')
+
+        self.server = server.Server(self.path)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self._dir.cleanup()
+
+    def test_socket(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+        # running
+        with self.assertRaises(OSError):
+            server.Server(self.path)
+        self.assertIsNone(server.request(self.path, self.root / 'eggs'))
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.path))
+        # stale socket
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(self.path)
+        self.server = server.Server(self.path)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @unittest.mock.patch('scmver.git.dirty', return_value=False)
+    @unittest.mock.patch('scmver.core.stat')
+    def test_request(self, stat, dirty):
+        root = self.root / 'spam'
+        (root / '.git').mkdir(parents=True)
+        info = core.SCMInfo('v1.0', 0, 'abc', False, 'master')
+        stat.return_value = info
+
+        self.assertEqual(server.request(self.path, root), info)
+        self.assertEqual(server.request(self.path, root), info)
+        self.assertEqual(stat.call_count, 1)
+        stat.assert_called_with(str(root))
+        # other options
+        self.assertEqual(server.request(self.path, root, **{'git.tag': ['v*']}), info)
+        self.assertEqual(stat.call_count, 2)
+        stat.assert_called_with(str(root), **{'git.tag': ['v*']})
+        # edited
+        dirty.return_value = True
+        self.assertEqual(server.request(self.path, root), info._replace(dirty=True))
+        self.assertEqual(stat.call_count, 2)
+        dirty.return_value = False
+        # updated
+        with (root / '.git' / 'HEAD').open('w') as fp:
+            fp.write('ref: refs/heads/master\n')
+        stat.return_value = info._replace(distance=1)
+        self.assertEqual(server.request(self.path, root), info._replace(distance=1))
+        self.assertEqual(stat.call_count, 3)
+
+        stat.return_value = None
+        self.assertIsNone(server.request(self.path, self.root / 'eggs'))
+
+        # least recently used
+        stat.return_value = info
+        with unittest.mock.patch.object(server, '_MAXSIZE', 2):
+            for tag in ('a', 'b', 'c'):
+                server.request(self.path, root, **{'git.tag': [tag]})
+        self.assertEqual(len(self.server._infos), 2)
+
+    @unittest.mock.patch('scmver.core.stat')
+    def test_error(self, stat):
+        for e in (TimeoutError('timeout'), ValueError('value'), OSError('os')):
+            stat.side_effect = e
+            with self.assertRaisesRegex(type(e), str(e)):
+                server.request(self.path, self.root)
+
+        with self.assertRaises(OSError):
+            server.request(str(self.root / 'eggs.sock'), self.root)
@@ -6,11 +6,16 @@
 #   SPDX-License-Identifier: MIT
 #
 
+import importlib.util
 import os
+import subprocess
+import sys
 import textwrap
+import unittest.mock
 
 from setuptools import Distribution
 
+import scmver
 from scmver import core, setuptools
 from base import requires_tomli, SCMVerTestCase
 
@@ -107,6 +112,58 @@ class SetuptoolsTestCase(SCMVerTestCase):
             self.write_template(fp, version='1.4')
         self.assertEqual(self.finalize_version(scmver), '1.4')
 
+    def importtime(self, code):
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join((os.path.dirname(os.path.dirname(scmver.__file__)), *sys.path))
+        proc = subprocess.run((sys.executable, '-X', 'importtime', '-c', code),
+                              capture_output=True, env=env, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        rv = {}
+        for l in proc.stderr.splitlines():
+            if l.startswith('import time:'):
+                v = l.split('|')
+                if v[1].strip().isdigit():
+                    rv[v[2].strip()] = int(v[1])
+        return rv
+
+    def test_finalize_version_import_time(self):
+        with open('pyproject.toml', 'w') as fp:
+            fp.write(textwrap.dedent("""\
+                [build-system]
+                requires = ["setuptools"]
+                build-backend = "setuptools.build_meta"
+            """))
+
+        base = self.importtime('import setuptools')
+        m = self.importtime('import setuptools; import scmver.setuptools; scmver.setuptools.finalize_version(None)')
+        self.assertLessEqual(set(m) - set(base), {'__future__', 'scmver', 'scmver.__version__', 'scmver.setuptools'})
+        # microseconds
+        self.assertLess(m['scmver.setuptools'], 50000)
+
+    def test_all(self):
+        self.assertEqual(scmver.__all__, core.__all__)
+        for n in scmver.__all__:
+            self.assertIs(getattr(scmver, n), getattr(core, n))
+        self.assertLessEqual(set(scmver.__all__), set(dir(scmver)))
+        self.assertRaises(AttributeError, getattr, scmver, 'spam')
+
+    @unittest.skipUnless(importlib.util.find_spec('mypy'), 'requires mypy')
+    def test_all_typing(self):
+        with open('spam.py', 'w') as fp:
+            fp.write(textwrap.dedent("""\
+                import scmver
+
+                v: str | None = scmver.get_version('.')
+                b: bool = scmver.Version('1.0') < scmver.Version('1.1')
+                info: scmver.SCMInfo | None = scmver.stat('.')
+            """))
+        env = os.environ.copy()
+        env['MYPYPATH'] = os.path.dirname(os.path.dirname(scmver.__file__))
+        proc = subprocess.run((sys.executable, '-m', 'mypy', '--strict', '--no-incremental', '--python-version', '3.10', 'spam.py'),
+                              capture_output=True, env=env, text=True)
+        # errors in scmver are checked by the tox environment
+        self.assertEqual([l for l in proc.stdout.splitlines() if l.startswith('spam.py')], [])
+
     def test_scmver_with_boolean(self):
         self.init()
         self.assertIsNone(self.scmver(False))
@@ -138,6 +195,33 @@ class SetuptoolsTestCase(SCMVerTestCase):
         with open(value['write_to']) as fp:
             self.assertEqual(fp.read(), value['template'].format(version='1.0'))
 
+    def test_scmver_write_to_many(self):
+        self.init()
+
+        template = "__version__ = '{version}'\n"
+        value = {
+            'write_to': [
+                '__version__.py',
+                {'path': 'VERSION', 'template': '{version}\n'},
+                ['version.h', '#define VERSION "{version}"\n'],
+                {'path': 'version.py'},
+            ],
+            'template': template,
+        }
+        self.assertEqual(self.scmver(value), '1.0')
+        for path, data in (
+            ('__version__.py', template),
+            ('VERSION', '{version}\n'),
+            ('version.h', '#define VERSION "{version}"\n'),
+            ('version.py', template),
+        ):
+            with open(path) as fp:
+                self.assertEqual(fp.read(), data.format(version='1.0'))
+
+        for write_to in ([None], [['VERSION']], [{'template': ''}]):
+            with self.assertRaises(ValueError):
+                self.scmver({'write_to': write_to})
+
     def test_scmver_fallback(self):
         os.mkdir('src')
 
@@ -197,3 +281,34 @@ class SetuptoolsTestCase(SCMVerTestCase):
                 'spec': 'micro',
                 'fallback': ['__version__:version', 'scmver']
             })
+
+    def test_load_cfg_cache(self):
+        path = 'setup.cfg'
+
+        with open(path, 'w') as fp:
+            self.write_sync(fp, """\
+                [metadata]
+                name = spam
+            """)
+        with unittest.mock.patch('configparser.ConfigParser') as cp:
+            self.assertEqual(setuptools.load_cfg(path), {})
+            self.assertEqual(cp.call_count, 0)
+
+        with open(path, 'a') as fp:
+            self.write_sync(fp, """\
+                [scmver]
+                spec = micro
+            """)
+        self.assertEqual(setuptools.load_cfg(path), {'spec': 'micro'})
+        with unittest.mock.patch('configparser.ConfigParser') as cp:
+            self.assertEqual(setuptools.load_cfg(path), {'spec': 'micro'})
+            self.assertEqual(cp.call_count, 0)
+
+        with open(path, 'a') as fp:
+            self.write_sync(fp, """\
+                local = {local}
+            """)
+        self.assertEqual(setuptools.load_cfg(path), {
+            'spec': 'micro',
+            'local': '{local}',
+        })
@@ -11,6 +11,7 @@ from pathlib import Path
 import textwrap
 import unittest
 import unittest.mock
+import xml.etree.ElementTree as ET
 
 from scmver import core, subversion as svn, util
 from base import SCMVerTestCase
@@ -208,6 +209,7 @@ class SubversionTestCase(SCMVerTestCase):
         self.checkout('repo', 'wc')
         svn.run('mkdir', 'trunk', 'branches', 'tags')
         self.assertEqual(svn.parse(Path(), name='.svn'), core.SCMInfo(revision=0, dirty=True))
+        self.assertTrue(svn.dirty(Path(), name='.svn'))
 
         svn.run('commit', '-m', '_')
         svn.run('update')
@@ -216,6 +218,7 @@ class SubversionTestCase(SCMVerTestCase):
         with open('file', 'w'):
             pass
         self.assertEqual(svn.parse(Path(), name='.svn'), core.SCMInfo(distance=1, revision=1))
+        self.assertFalse(svn.dirty(Path(), name='.svn'))
 
     def test_version(self):
         self.assertGreaterEqual(len(svn.version()), 3)
@@ -254,3 +257,77 @@ class SubversionTestCase(SCMVerTestCase):
             ):
                 run.return_value = (out, '')
                 self.assertEqual(svn.version(), e)
+
+
+class TagIndexTestCase(SCMVerTestCase):
+
+    def log(self, *args, **kwargs):
+        r, lo = map(int, args[2].split(':'))
+        n = int(args[args.index('-l') + 1]) if '-l' in args else None
+        e = ET.Element('log')
+        for i in sorted((i for i in self.tags if lo <= i <= r), reverse=True)[:n]:
+            le = ET.SubElement(e, 'logentry', revision=str(i))
+            paths = ET.SubElement(le, 'paths')
+            for tag in self.tags[i]:
+                ET.SubElement(paths, 'path', kind='dir').text = f'/tags/{tag}'
+        return e, ''
+
+    def test_tags_of(self):
+        self.tags = {
+            3: ['v1.0'],
+            7: ['v1.1'],
+            8: [],
+            12: ['v1.2', 'v1.2.0'],
+        }
+        info = {
+            'Repository Root': 'file:///repo',
+            'Repository UUID': '00000000-0000-0000-0000-000000000000',
+        }
+
+        def tags_of(revision):
+            for r, tags in svn._tags_of('.', info, '/tags/', revision, cache_dir=path):
+                if tags:
+                    return r, tags
+
+        with (self.tempdir() as path,
+              unittest.mock.patch(f'{svn.__name__}.run', side_effect=self.log) as run):
+            self.assertEqual(tags_of(10), (7, ['v1.1']))
+            self.assertEqual(run.call_count, 1)
+            # scanned
+            self.assertEqual(tags_of(8), (7, ['v1.1']))
+            self.assertEqual(tags_of(10), (7, ['v1.1']))
+            self.assertEqual(run.call_count, 1)
+            # below the scanned range
+            self.assertEqual(tags_of(5), (3, ['v1.0']))
+            self.assertEqual(run.call_count, 2)
+            # above the scanned range
+            self.assertEqual(tags_of(15), (12, ['v1.2', 'v1.2.0']))
+            self.assertEqual(tags_of(2), None)
+            self.assertEqual(tags_of(13), (12, ['v1.2', 'v1.2.0']))
+            self.assertEqual(run.call_count, 4)
+            # keep the scanned range
+            self.assertEqual(tags_of(9), (7, ['v1.1']))
+            self.assertEqual(tags_of(15), (12, ['v1.2', 'v1.2.0']))
+            self.assertEqual(run.call_count, 4)
+            self.assertEqual(run.call_args_list[2].args[2], '15:11')
+
+        # all revisions which have tags
+        with (self.tempdir() as path,
+              unittest.mock.patch(f'{svn.__name__}.run', side_effect=self.log) as run):
+            tags = [(8, []), (7, ['v1.1']), (3, ['v1.0'])]
+            self.assertEqual(list(svn._tags_of('.', info, '/tags/', 10, cache_dir=path)), tags)
+            self.assertEqual(run.call_count, 1)
+
+            self.tags.update({25: ['v2.0'], 26: []})
+            tags = [(26, []), (25, ['v2.0']), (12, ['v1.2', 'v1.2.0'])] + tags
+            self.assertEqual(list(svn._tags_of('.', info, '/tags/', 30, cache_dir=path)), tags)
+            self.assertEqual(run.call_count, 2)
+            self.assertEqual(list(svn._tags_of('.', info, '/tags/', 30, cache_dir=path)), tags)
+            self.assertEqual(run.call_count, 2)
+
+        with unittest.mock.patch(f'{svn.__name__}.run', side_effect=self.log) as run:
+            path = None
+            with unittest.mock.patch.dict('os.environ', {'SCMVER_CACHE_DIR': ''}):
+                self.assertEqual(tags_of(10), (7, ['v1.1']))
+                self.assertEqual(tags_of(10), (7, ['v1.1']))
+            self.assertEqual(run.call_count, 2)
@@ -1,13 +1,18 @@
 #
 # test_util
 #
-#   Copyright (c) 2019-2024 Akinori Hattori <hattya@gmail.com>
+#   Copyright (c) 2019-2026 Akinori Hattori <hattya@gmail.com>
 #
 #   SPDX-License-Identifier: MIT
 #
 
+import io
+import json
+import os
 from pathlib import Path
 import sys
+import time
+import unittest.mock
 
 from scmver import util
 from base import SCMVerTestCase
@@ -33,6 +38,34 @@ class UtilTestCase(SCMVerTestCase):
         self.assertEqual(out, '\U0001d70b = 3.14')
         self.assertEqual(err, '')
 
+    def test_exec_timeout(self):
+        cmd = 'import time; time.sleep(10)'
+        start = time.monotonic()
+        with self.assertRaisesRegex(TimeoutError, r'^command timed out after '):
+            util.exec_((Path(sys.executable), '-c', cmd), timeout=0.5)
+        self.assertLess(time.monotonic() - start, 5)
+
+        with util.limit(timeout=0.5):
+            with self.assertRaisesRegex(TimeoutError, r'^command timed out after '):
+                util.exec_((Path(sys.executable), '-c', cmd))
+
+    def test_limit(self):
+        cmd = 'import time; time.sleep(10)'
+        start = time.monotonic()
+        with util.limit(deadline=0.5):
+            with self.assertRaisesRegex(TimeoutError, r'^command timed out after '):
+                util.exec_((Path(sys.executable), '-c', cmd))
+            with self.assertRaisesRegex(TimeoutError, r'^deadline exceeded: '):
+                util.exec_((Path(sys.executable), '-V'))
+            # nested deadline cannot extend the outer one
+            with util.limit(deadline=60):
+                with self.assertRaisesRegex(TimeoutError, r'^deadline exceeded: '):
+                    util.exec_((Path(sys.executable), '-V'))
+        self.assertLess(time.monotonic() - start, 5)
+
+        out, _ = util.exec_((Path(sys.executable), '-c', 'print(1)'))
+        self.assertEqual(out.strip(), '1')
+
     def test_command(self):
         sh = 'sh' if sys.platform != 'win32' else 'cmd'
         self.assertEqual(Path(util.command(sh)).stem, sh)
@@ -48,3 +81,110 @@ class UtilTestCase(SCMVerTestCase):
         self.assertNotEqual(util.which(sh), sh)
         self.assertEqual(Path(util.which(sh)).stem, sh)
         self.assertIsNone(util.which('__scmver.util__'))
+
+    @unittest.mock.patch.dict('os.environ')
+    def test_parents(self):
+        os.environ.pop('SCMVER_CEILING_DIRECTORIES', None)
+        with self.tempdir() as path:
+            root = os.path.join(path, 'a', 'b')
+            os.makedirs(root)
+            dirs = list(util.parents(root))
+            self.assertEqual(dirs[:3], [root, os.path.dirname(root), path])
+            self.assertEqual(dirs[-1], os.path.dirname(dirs[-2]))
+
+            self.assertEqual(list(util.parents(root, [path])), [root, os.path.dirname(root)])
+            self.assertEqual(list(util.parents(root, os.path.dirname(root))), [root])
+            self.assertEqual(list(util.parents(root, os.pathsep.join(('', 'a', path)))), [root, os.path.dirname(root)])
+            os.environ['SCMVER_CEILING_DIRECTORIES'] = os.path.join(path, 'a', '')
+            self.assertEqual(list(util.parents(root)), [root])
+            del os.environ['SCMVER_CEILING_DIRECTORIES']
+
+            # filesystem boundary
+            def stat(p):
+                st = os_stat(p)
+                return unittest.mock.Mock(st_dev=st.st_dev + (not p.startswith(path)))
+
+            os_stat = os.stat
+            with unittest.mock.patch('os.stat', side_effect=stat):
+                self.assertEqual(list(util.parents(root, one_filesystem=True)), [root, os.path.dirname(root), path])
+            self.assertEqual(list(util.parents(root, one_filesystem=True))[:3], [root, os.path.dirname(root), path])
+
+    def test_trace(self):
+        seen = []
+        with util.trace(seen.append) as events:
+            with util.span('spam', eggs='ham'):
+                util.exec_((Path(sys.executable), '-c', 'print("spam")'), cwd=os.getcwd())
+            with self.assertRaises(TimeoutError):
+                util.exec_((Path(sys.executable), '-c', 'import time; time.sleep(10)'), timeout=0.5)
+            with util.trace() as inner:
+                util.exec_((Path(sys.executable), '-V'))
+        util.exec_((Path(sys.executable), '-V'))
+
+        self.assertEqual(events, seen)
+        self.assertEqual([ev.name for ev in events], ['exec', 'spam', 'exec', 'exec'])
+        self.assertEqual(inner, events[3:])
+
+        ev = events[0]
+        self.assertEqual(ev.args, {
+            'argv': [sys.executable, '-c', 'print("spam")'],
+            'cwd': os.getcwd(),
+            'returncode': 0,
+            'stdout': len(f'spam{os.linesep}'),
+            'stderr': 0,
+        })
+        self.assertLessEqual(ev.start, ev.end)
+        self.assertLessEqual(events[1].start, ev.start)
+        self.assertGreaterEqual(events[1].end, ev.end)
+        self.assertEqual(events[1].args, {'eggs': 'ham'})
+        self.assertIsNone(events[2].args['returncode'])
+        self.assertIsNone(events[3].args['cwd'])
+
+        fp = io.StringIO()
+        util.dump_trace(events, fp)
+        trace = json.loads(fp.getvalue())
+        self.assertEqual(len(trace['traceEvents']), 4)
+        for e, ev in zip(trace['traceEvents'], events):
+            self.assertEqual(e['name'], ev.name)
+            self.assertEqual(e['ph'], 'X')
+            self.assertEqual(e['pid'], os.getpid())
+            self.assertEqual(e['tid'], ev.thread)
+            self.assertEqual(e['args'], ev.args)
+            self.assertAlmostEqual(e['dur'], (ev.end - ev.start) * 1e6)
+
+    def test_record(self):
+        python = Path(sys.executable)
+        with self.tempdir() as path:
+            cassette = Path(path) / 'cassette.json'
+            with util.record(cassette, spam='eggs'):
+                for i in range(2):
+                    util.exec_((python, '-c', f'import sys; print({i}); sys.exit({i})'), cwd=path)
+                    util.exec_((python, '-c', 'import sys; print(sys.argv[1])', str(i)))
+                util.exec_((python, '-c', 'import sys; sys.stderr.buffer.write(bytes(range(256)))'), encoding='latin-1')
+            with cassette.open() as fp:
+                calls = json.load(fp)['calls']
+            self.assertEqual(len(calls), 5)
+            self.assertEqual(calls[0]['argv'], [sys.executable, '-c', 'import sys; print(0); sys.exit(0)'])
+            self.assertEqual(calls[0]['cwd'], path)
+            self.assertEqual(calls[2]['returncode'], 1)
+
+            # replay
+            name = python.with_name(f'spam{python.suffix}')
+            with (util.replay(cassette) as meta,
+                  util.trace() as events,
+                  unittest.mock.patch('subprocess.run', side_effect=AssertionError)):
+                self.assertEqual(meta, {'spam': 'eggs'})
+                self.assertEqual(util.command(python.name), python.name)
+                self.assertEqual(util.command('__scmver.util__', python.stem), python.stem)
+                self.assertEqual(util.command('__scmver.util__', '__test_util__'), '__scmver.util__')
+                self.assertEqual(util.exec_((python, '-c', 'import sys; print(0); sys.exit(0)')), (f'0{os.linesep}', ''))
+                self.assertEqual(util.exec_((python, '-c', 'import sys; print(1); sys.exit(1)')), (f'1{os.linesep}', ''))
+                self.assertEqual(util.exec_((python, '-c', 'import sys; print(1); sys.exit(1)')), (f'1{os.linesep}', ''))
+                self.assertEqual(util.exec_((python, '-c', 'import sys; sys.stderr.buffer.write(bytes(range(256)))'),
+                                            encoding='latin-1'), ('', bytes(range(256)).decode('latin-1')))
+                # another machine
+                self.assertEqual(util.exec_((python.parent / 'bin' / python.name, '-c', 'import sys; print(sys.argv[1])', '1')),
+                                 (f'1{os.linesep}', ''))
+                with self.assertRaises(LookupError):
+                    util.exec_((name, '-c', 'import sys; print(sys.argv[1])', '1'))
+            self.assertEqual([ev.args['returncode'] for ev in events], [0, 1, 1, 0, 0])
+            self.assertEqual(util.command(python.name), util.which(python.name))